@@ -5,13 +5,18 @@
 Functions to derive atomic solution formulae from Boolean coincidence data tables
 """
 import copy               # for deep-copy of lists
-import re                 # regex for complex search patterns in strings
 import pandas as pd       # for reading csv files that contain truth tables
 import itertools          # itertools provides functions to obtain all permutations of a string and Cartesian products of lists
-import multiprocessing    # multiprocessing and functools for multicore usage
+import bisect             # bisection of sorted lists
+import re                 # regular expressions
+import os                 # number of available CPUs
 import suspension_search as ss
 from utils import get_components_from_formula, get_factor_level, get_factor_order, get_equiv_formula, list_to_string, \
-                  string_to_list, contains_term, flatten_nested_list, find_effects, get_coextensive_factors
+                  string_to_list, flatten_nested_list, find_effects, get_coextensive_factors, get_term_mask
+
+# minimal number of min-terms for which the equivalence formulae of the effects are derived by a pool of
+# worker processes, for smaller truth tables starting the workers takes longer than deriving the formulae
+PARALLEL_MIN_TERMS = 64
 
 def get_instance_formula_to_factor(in_formula: list, factor: str, level_factor_list_order: list) -> dict:
     """Derives the instance function for factor from the formula in_formula.
@@ -46,40 +51,26 @@ def get_instance_formula_to_factor(in_formula: list, factor: str, level_factor_l
 
     output = {}
 
-    full_formula = [x for x in in_formula]
-
     factor_level = get_factor_level(factor, level_factor_list_order)
-    factor_order = get_factor_order(factor, level_factor_list_order)
-
-
-    for lvl in range(len(level_factor_list_order)):
-        for order in range(len(level_factor_list_order[lvl])):
-            # removing all factors of different level from the instance function
-            # reduces the further calculations significantly
-            # however, an additional test will be necessary to check if the truncated instance formula
-            # are correct (possible error: full instance function would be A + B <-> C, truncated function with A,C < B
-            # becomes A <->, C which is wrong)
-            if not(factor_level == lvl or factor_level == lvl + 1):
-                for fac in level_factor_list_order[lvl][order]:
-                    neg_fac = "~" + fac
-                    for term in range(len(full_formula)-1,-1,-1):
-                        if fac in full_formula[term]:
-                            full_formula[term].remove(fac)
-                        elif neg_fac in full_formula[term]:
-                            full_formula[term].remove(neg_fac)
-                            #full_formula[term] = full_formula[term].replace(factor,"")
 
+    # removing all factors of different level from the instance function
+    # reduces the further calculations significantly
+    # however, an additional test will be necessary to check if the truncated instance formula
+    # are correct (possible error: full instance function would be A + B <-> C, truncated function with A,C < B
+    # becomes A <->, C which is wrong)
+    # -> the literals to be removed only depend on the level of factor, they are collected once in a set
+    drop_literals = {lit for lvl, level in enumerate(level_factor_list_order) if not(factor_level == lvl or factor_level == lvl + 1) \
+                     for order in level for fac in order for lit in (fac, "~" + fac)}
+
+    full_formula = [[x for x in term if not(x in drop_literals)] for term in in_formula]
+    set_formula = [set(term) for term in full_formula] # the disjuncts as sets for fast membership tests
 
     neg_fac = "~" + factor
     for term in full_formula:
         if factor in term:
-            aux = [x for x in term]
-            aux.remove(factor)
-            output[list_to_string(aux)] = True
+            output["*".join([x for x in term if x != factor])] = True
         elif neg_fac in term:
-            aux = [x for x in term]
-            aux.remove(neg_fac)
-            output[list_to_string(aux)] = False
+            output["*".join([x for x in term if x != neg_fac])] = False
 
     # test the instance formula for wrong entries due to truncation
     delete_list = [] # list of wrong entries in output
@@ -89,13 +80,9 @@ def get_instance_formula_to_factor(in_formula: list, factor: str, level_factor_l
         else:
             neg_fac = factor
 
-        for disj in full_formula:
-            found_all = True
-            for term in string_to_list(disj_ins)[0]:
-                if not(term in disj):
-                    found_all = False
-                    break
-            if found_all:
+        conj_ins = set(string_to_list(disj_ins)[0]) # parse the instance disjunct only once
+        for disj in set_formula:
+            if conj_ins <= disj:
                 # check whether factor appears in disj as part of full_formula as it appears in the preliminary instance function
                 # if not: add the entry to delete_list and remove it from the instance function
                 if neg_fac in disj:
@@ -110,138 +97,6 @@ def get_instance_formula_to_factor(in_formula: list, factor: str, level_factor_l
 
     return output
 
-def reduce_term_by(term: str, literal: str) -> str:
-    """Removes the string literal from the string term. If term starts
-    with literal, the string literal + '*' is removed from term, otherwise
-    the string '*' + literal.
-
-    It is used to remove literal from a chain of conjuncts in the string term.
-
-    Parameters
-    __________
-    term: str
-        string to be reduced, expected to express a conjunctive
-        formula with conjunctor '*'
-    literal: str
-        string which should be removed from term
-
-    Returns
-    _______
-    str
-        term reduced by literal + '*' or '*' + literal
-    """
-
-    if term == literal:
-        # if term is atomic
-        # return empty string because no reducted term exists
-        return ""
-    else:
-        # term is a complex
-        st = literal + "*"
-        if term.find(st) > 0 or term.find(st) == -1:
-            # literal is not first conjunct
-            # then cut string of conjunctions to the left
-            st = "*" + literal
-        return term.replace(st,"")
-
-def absorb_terms(arg: tuple) -> list:
-    """Applies the absorption rule a*b*c*d*e + a*c*d <-> a*c*d to simplify a DNF which is
-    passed to this function in form of a nested list.
-
-    Returns the simplified DNF as nested list.
-
-    Parameters
-    __________
-    arg: tuple
-        arg[0] - is a nested list arg[0][LIST OF CONJUNCTS][CONJUNCTS]
-        arg[1] - is a nested list, arg[1][LIST OF DISJUNCTS][LIST OF CONJUNCTS][CONJUNCTS],
-                 it should include arg[0]
-
-    Returns
-    _______
-    list of lists of str
-        nested list of the form [DISJUNCTS][CONJUNCTS] corresponding to
-        arg[1] after applying the absorption rule
-    """
-
-    # absorption rule: in the list of disjunctions, discard disjuncts that can be formed by conjuncting terms to other disjuncts of the list
-    # so: if all elemts of a list of conjuncts are completely contained in another, discard the larger list
-    return [[disj for disj in arg[1] if all([x in conj_2 for x in conj] for conj in disj)] for conj_2 in arg[0]]
-
-
-def distribution(formula: str) -> str:
-    """Applies the distribution rule on a logical formula given as a string as often as possible,
-    then applies the absorption rule to simplify the resulting formula as often as possible.
-
-    Returns the simplified formula as a string.
-
-    Parameters
-    __________
-    formula: str
-        expected to express a DNF with disjunctor ' + ' and conjunctor '*'
-
-    Returns
-    _______
-    str
-        simplified formula after applying distribution and absorption rules
-    """
-
-    # as long as formula has a conjunctor right before or after a bracket
-    if (formula.find(")*") > -1 or formula.find("*(") > -1):
-
-        formula = formula[:-1] # get rid of trailing ")"
-        conj_list = re.split(r'\)\*', formula) # list of conjuncts of formula
-        conj_list = [conj[1:] for conj in conj_list] # get rid of leading "("
-
-        disj_list = [] # list of disjuncts per conjunct
-        for conj in conj_list:
-            disj_list.append(re.split(r'\s*\+\s*', conj))
-        # disj_list is a list [[d11, d12, ...], [d21, d22, ... ],  ...] with dij being the j-th disjunct in conjunct i
-
-        # rebuild formula
-        formula = list_to_string([[*x] for x in itertools.product(*disj_list)])
-
-        disj_list.clear()
-        conj_list.clear()
-
-
-        disj_list = re.split(r'\s*\+\s*', formula) # list of disjuncts of new formula
-
-        #conj_list = [list(set(re.split(r'\*', disj))).sort() for disj in disj_list] # doesn't work
-
-        conj_list = []
-        set_disjuncts = set() # set in place of a list automatically discards duplicates
-        for disj in disj_list:
-            if not(disj in set_disjuncts):
-                a = list(set(re.split(r'\*', disj)))
-                a.sort()
-                conj_list.append(a)
-                set_disjuncts.add(disj)
-
-        new_list = []
-        for disj in conj_list:
-            if not(disj in new_list):
-                new_list.append(disj)
-
-        # simplify by absorption (a*b*c*d*e + a*c*d <-> a*c*d)
-
-        # start working on all CPUs
-        arguments = ([f, new_list] for f in new_list)
-        with multiprocessing.Pool() as pool:
-	        # call the function for each item in parallel
-            absorbed_terms = pool.map(absorb_terms, arguments)
-
-        pool.close()
-        pool.join()
-
-        new_list = [i for i in new_list if i not in absorbed_terms]
-
-        new_list.sort()
-        # translate formula encoded in the nested list of disjuncts of conjuncts into a string
-        formula = list_to_string(new_list)
-
-    return formula
-
 def get_prime_implicants(instance_formula: dict, factor: str, level_factor_list: list) -> list:
     """Applies the Quine-McCluskey algorithm to obtain prime implicants by comparing the
     min-terms of positive instance function with those of the negative instance function:
@@ -272,46 +127,74 @@ def get_prime_implicants(instance_formula: dict, factor: str, level_factor_list:
     # get number of True terms in instance_formula
     num_entries = 1
     for disj in instance_formula:
-        if num_entries < len(get_components_from_formula(disj, level_factor_list)):
-            num_entries = len(get_components_from_formula(disj, level_factor_list))
-
+        num_components = len(get_components_from_formula(disj, level_factor_list))
+        if num_entries < num_components:
+            num_entries = num_components
+
+    # every conjunctive term is encoded as a bitmask of its literals,
+    # such that containment of terms reduces to a bitwise comparison
+    literal_bits = {}
+    term_masks = {}
+    for term in instance_formula:
+        term_masks[term] = get_term_mask(term, literal_bits)
+    # split the instance formula once into its positive terms and the bitmasks of its negative terms
+    pos_terms = [term for term in instance_formula if instance_formula[term]]
+    neg_masks = list({term_masks[term] for term in instance_formula if not(instance_formula[term])})
+    # index of the negative terms by literal: the bits of neg_with_literal[lit] mark the negative terms
+    # (by their position in neg_masks) that contain lit, such that the negative terms that contain a fragment
+    # are obtained by intersecting these bitsets for the literals of the fragment
+    neg_with_literal = {}
+    for index, neg_mask in enumerate(neg_masks):
+        for lit in literal_bits:
+            if neg_mask & literal_bits[lit]:
+                neg_with_literal[lit] = neg_with_literal.get(lit, 0) | (1 << index)
+    all_negs = (1 << len(neg_masks)) - 1
+    contained_in_neg = {} # bitmask of a fragment -> whether the fragment is contained in a negative term
 
     reduced_term_list = []
+    reduced_term_set = [] # the same terms as in reduced_term_list as sets for fast membership tests
     prime_imp_list = []
     # prepare sub-lists of reduced_term_list
     for k in range(num_entries,-1,-1):
         reduced_term_list.append([])
+        reduced_term_set.append(set())
 
 
-    for term in instance_formula:
-        if instance_formula[term]:
-            reduced_term_list[num_entries].append(term)
+    reduced_term_list[num_entries].extend(pos_terms)
+    reduced_term_set[num_entries].update(pos_terms)
 
     for k in range(num_entries,-1,-1):
         for term in reduced_term_list[k]:
             # only check term if not already known as prime implicator
             if not(term in prime_imp_list):
                 any_lit_found = True
-                term_list = string_to_list(term)[0]
+                term_list = term.split("*")
+                term_mask = term_masks[term]
                 # reduce term by one of its literals and check whether the reduced fragments is not contained in any negative term
-                for lit in term_list:
+                for i_lit in range(len(term_list)):
+                    reduced_term = "*".join(term_list[:i_lit] + term_list[i_lit+1:])
 
                     # check only fragments that are neither already known to be not contained in any negative term
                     # (that are not listed in reduced_term_list[k-1]), nor empty strings
-                    if not(reduce_term_by(term, lit) in reduced_term_list[k-1]) and reduce_term_by(term, lit) != "":
-                        contained = False
-                        for neg_term in instance_formula:
-                            # loop over all negative terms of the instance formula
-                            if not(instance_formula[neg_term]): # only continue with False neg_terms
-                                if contains_term(reduce_term_by(term, lit), neg_term):
-                                    contained = True
-                                    break # break from for-loop over negative terms after the fragment has been found in one negative term
+                    if not(reduced_term in reduced_term_set[k-1]) and reduced_term != "":
+                        # the bitmask of the fragment is that of term without the bit of the removed literal
+                        reduced_mask = term_mask & ~literal_bits[term_list[i_lit]]
+                        term_masks[reduced_term] = reduced_mask
+                        # the same fragment arises from several terms, hence the negative terms are searched only once for it
+                        if not(reduced_mask in contained_in_neg):
+                            candidates = all_negs
+                            for n_lit in range(len(term_list)):
+                                if n_lit != i_lit:
+                                    candidates &= neg_with_literal.get(term_list[n_lit], 0)
+                            contained_in_neg[reduced_mask] = candidates != 0
+                        contained = contained_in_neg[reduced_mask]
 
                         any_lit_found =  any_lit_found and contained
                         if not(contained): # if a fragment resulting from deleting a literal from term is not contained in any
                             # negative instance term, add the fragment to the list of terms that is gradually shortened and checked to
                             # for being a prime implicator
-                            reduced_term_list[k-1].append(reduce_term_by(term, lit))
+                            reduced_term_list[k-1].append(reduced_term)
+                            reduced_term_set[k-1].add(reduced_term)
 
 
                 if any_lit_found: # if all fragments resulting from deleting a literal from term are contained in negative instance terms,
@@ -325,11 +208,16 @@ def get_prime_implicants(instance_formula: dict, factor: str, level_factor_list:
             if not(at_term in prime_imp_list):
                 prime_imp_list.append(at_term)
 
-    for n_pi in range(len(prime_imp_list)-1,-1,-1):
-        for pi in prime_imp_list:
-            if contains_term(pi, prime_imp_list[n_pi]) and not(pi == prime_imp_list[n_pi]):
-                del prime_imp_list[n_pi]
-                break
+    # discard every prime implicant that contains another one, the list is rebuilt once instead of
+    # deleting its entries one by one (the empty term with mask 0 is not contained in any term)
+    # a term can only be contained in another one with more literals, hence the distinct masks are sorted by
+    # their number of literals and every prime implicant is compared with the shorter ones only
+    pi_masks = [term_masks[pi] for pi in prime_imp_list]
+    sub_masks = sorted(set(pi_masks) - {0}, key=int.bit_count)
+    sub_sizes = [mask.bit_count() for mask in sub_masks]
+    prime_imp_list = [pi for pi, pi_mask in zip(prime_imp_list, pi_masks) \
+                      if not(any(mask & pi_mask == mask for mask in \
+                                 itertools.islice(sub_masks, bisect.bisect_left(sub_sizes, pi_mask.bit_count()))))]
 
     return prime_imp_list
 
@@ -354,18 +242,36 @@ def get_rdnf(pi_list: list, formula: dict, factor_list: list) -> list:
     """
 
     solutions_list = []
-    out_formula = ""
 
     # define list of essential prime implicants
     e_pi_list = []
+    e_pi_set = set() # the same prime implicants as a set for fast membership tests
+    # the prime implicants are encoded as bitmasks of their literals once,
+    # such that testing whether they are contained in a min-term is a bitwise comparison
+    # (the empty string, encoded by 0, is not contained in any term)
+    literal_bits = {}
+    pi_masks = [(lit, get_term_mask(lit, literal_bits)) for lit in pi_list]
+    # the bits of pis_with_literal[bit] mark the prime implicants (by their index in pi_list) that contain
+    # the literal encoded by bit, a prime implicant is contained in a min-term iff none of its literals
+    # is missing in the min-term, so the prime implicants of a min-term are found by one pass over the literals
+    pis_with_literal = {bit: 0 for bit in literal_bits.values()}
+    non_empty_pis = 0
+    for index, (lit, lit_mask) in enumerate(pi_masks):
+        if lit_mask:
+            non_empty_pis |= 1 << index
+        for bit in pis_with_literal:
+            if lit_mask & bit:
+                pis_with_literal[bit] |= 1 << index
     # check for essential prime implicants
     uncovered_terms = {}
     for term in formula:
         if formula[term]:
-            aux_list = []
-            for lit in pi_list:
-                if contains_term(lit,term):
-                    aux_list.append(lit)
+            term_mask = get_term_mask(term, literal_bits)
+            covering_pis = non_empty_pis
+            for bit in pis_with_literal:
+                if not(term_mask & bit):
+                    covering_pis &= ~pis_with_literal[bit]
+            aux_list = [pi_masks[index][0] for index in range(len(pi_masks)) if covering_pis >> index & 1]
 
             if not(aux_list):
                 # no pi found that makes this min-term true, should never happen
@@ -373,8 +279,9 @@ def get_rdnf(pi_list: list, formula: dict, factor_list: list) -> list:
             else:
                 if len(aux_list) == 1:
                     # term is only covered by one prime implicant -> this is an essential prime implicant
-                    if not(aux_list[0] in e_pi_list):
+                    if not(aux_list[0] in e_pi_set):
                         e_pi_list.append(aux_list[0])
+                        e_pi_set.add(aux_list[0])
                 else:
                     # several prime implicants cover term
                     uncovered_terms[term] = aux_list
@@ -382,22 +289,11 @@ def get_rdnf(pi_list: list, formula: dict, factor_list: list) -> list:
 
     # simplest case would be that the disjunction of essential prime implicants covers al min terms
     # check if this the case
-    all_covered = True
-    for term in uncovered_terms:
-        covered = False
-        for epi in e_pi_list:
-            if epi in term:
-                covered = True
-                break
-        all_covered = all_covered and covered
-        if not(all_covered):
-            break
+    all_covered = all(any(epi in term for epi in e_pi_list) for term in uncovered_terms)
 
 
     # the corresponding formula:
-    for epi in e_pi_list:
-        out_formula = out_formula + " + " + epi
-    out_formula = out_formula[3:] # remove the leading " + "
+    out_formula = " + ".join(e_pi_list)
 
     if all_covered:
         # first case: disjunction of all essential prime implicants covers all min terms
@@ -412,79 +308,91 @@ def get_rdnf(pi_list: list, formula: dict, factor_list: list) -> list:
         # D) simplify it by applying idempotence and absorption law
         # -> each disjunct of the remaining formula is one solution + to be added to the disjunction of essential PIs
 
-        # create a dictionary for PIs
-        dict_pi = {}
-        for i in range(len(pi_list)):
-            abbr = "PI" + str(i)
-            dict_pi[pi_list[i]] = abbr
-
-        aux_formula = "("
-
-        for u_term in uncovered_terms:
-            # check whether one essential PI covers u_term
-            e_covered = False
-            for epi in e_pi_list:
-                if epi in uncovered_terms[u_term]:
-                    e_covered = True
-                    break
-            if not(e_covered):
-                for PI in uncovered_terms[u_term]:
-                    if aux_formula[-1] == "(":
-                        # first term of a product
-                        aux_formula = aux_formula + dict_pi[PI]
-                    else:
-                        # all further terms
-                        aux_formula = aux_formula + " + " + dict_pi[PI]
-                # end of disjunctions
-                aux_formula = aux_formula + ")*("
-        # remove trailing "*("
-        aux_formula = aux_formula[:-2]
-
-        aux_formula = distribution(aux_formula)
-
-        # every disjunct of aux_formula constitutes one solution
-        sol_list = re.split(r'\s*\+\s*',aux_formula)
+        # placeholders for the PIs, the placeholder of pi_list[i] is pi_placeholders[i]
+        pi_placeholders = ["PI" + str(i) for i in range(len(pi_list))]
+        pi_index = {pi_list[i]: i for i in range(len(pi_list))} # index of every PI in pi_list
+
+        # product of the disjunctions of the PIs of every min-term that is not covered by an essential PI
+        pi_products = [uncovered_terms[u_term] for u_term in uncovered_terms if e_pi_set.isdisjoint(uncovered_terms[u_term])]
+
+        if len(pi_products) > 1:
+            # multiply out by the distributive law, but every conjunction of PIs is encoded as a bitmask
+            # of the indices of its PIs, such that the conjunctions are formed by bitwise or and
+            # duplicates are discarded after every factor instead of after expanding the whole product
+            conj_masks = {0}
+            for disj in pi_products:
+                disj_bits = {1 << pi_index[PI] for PI in disj}
+                conj_masks = {mask | bit for mask in conj_masks for bit in disj_bits}
+            # translate the bitmasks back into conjunctions of the PI-placeholders, sorted alphabetically
+            new_list = sorted(sorted(pi_placeholders[i] for i in range(mask.bit_length()) if mask >> i & 1) for mask in conj_masks)
+            # every disjunct of the multiplied out product constitutes one solution
+            sol_list = ["*".join(conj) for conj in new_list]
+        else:
+            # a single disjunction of PIs (or none): every PI of it constitutes one solution
+            sol_list = [pi_placeholders[pi_index[PI]] for disj in pi_products for PI in disj] or [""]
 
         for sol in sol_list:
             # in each solution "*" are to be changed into " + " (part of Petrick's algorithm)
             st = sol.replace("*"," + ")
             for i in range(len(pi_list)-1,-1,-1):
                 # replace the PI-placeholders by their values
-                st = st.replace("PI"+str(i),pi_list[i])
+                st = st.replace(pi_placeholders[i], pi_list[i])
             if out_formula != "":
-                st = out_formula + " + " + st
-            elif st[0] == "(":
-                # if there is no contribution by ePI, remove the leading and trailing bracket
-                st = st[1:]
-                if len(sol_list) == 1:
-                    # remove
-                    st = st[:-1]
-            elif len(st) > 0 and st[-1] == ")":
-                st = st[:-1]
-            if len(st) > 1 and st[-2] == "+":
-                # remove trailing " + "
-                st = st[:-3]
+                # add the disjunction of the essential PIs
+                st = out_formula + " + " + st if st else out_formula
 
             solutions_list.append(st)
 
     # remove solutions that are disjunctions of other solutions (if A <-> B then A + C <-> B should not be in the list of solutions)
-    for n_sol in range(len(solutions_list)-1,-1,-1):
-        list1 = get_components_from_formula(solutions_list[n_sol], factor_list)
-        for sol in solutions_list:
-            list2 = get_components_from_formula(sol, factor_list)
-            if len(list2) < len(list1):
-                cond = True
-                for fac in list2:
-                    if not(fac in list1):
-                        cond = False
-                        break
-
-                if cond:
-                    del solutions_list[n_sol]
-                    break
+    # the factors of every solution are encoded once as a bitmask together with their number
+    factor_bits = {}
+    sol_masks = []
+    for sol in solutions_list:
+        components = get_components_from_formula(sol, factor_list)
+        sol_masks.append((get_term_mask("*".join(components), factor_bits), len(components)))
+    # the list is rebuilt once instead of deleting its entries one by one, a solution that extends a shorter
+    # solution which is removed itself always extends a third one which is kept, so the result is the same
+    solutions_list = [sol for sol, (mask1, len1) in zip(solutions_list, sol_masks) \
+                      if not(any(len2 < len1 and mask2 & mask1 == mask2 for mask2, len2 in sol_masks))]
 
     return solutions_list
 
+def get_equiv_formulae_to_factor(formula: list, factor: str, level_factor_order_list: list) -> list:
+    """Derives the equivalence formulae for factor from the min-term formula formula
+    by means of Petrick's algorithm: determines the instance formula of factor, its prime
+    implicants and all reduced disjunctive normal forms of the instance formula.
+
+    Parameters
+    __________
+    formula: list of lists of str
+        min-term formula as nested list of form formula[DISJUNCT][CONJUNCT], it is not modified
+    factor: str
+        factor whose equivalence formulae are derived
+    level_factor_order_list: list of lists of lists of str
+        nested list of factors, form [LEVEL][CAUSAL_ORDER][FACTOR]
+
+    Returns
+    _______
+    list of str
+        equivalence formulae in form of 'DNF <-> factor'
+    """
+
+    equiv_formulae = []
+    # determine its instance formula (the min-term equivalence formula to factor)
+    i_formula = get_instance_formula_to_factor(formula, factor, level_factor_order_list)
+
+    # determine the prime implicants of this instance formula
+    pi_list = get_prime_implicants(i_formula, factor, level_factor_order_list)
+
+    if pi_list:
+        # list of prime implicants is non-empty
+        # obtain all possible transformations of the instance formula into the reduced disjunctive normal form
+        for sol in get_rdnf(pi_list, i_formula, level_factor_order_list):
+            # since sol is equivalent to factor, append the equivalence-operator and the second equivalent (factor)
+            equiv_formulae.append(sol + " <-> " + factor)
+
+    return equiv_formulae
+
 def get_truth_table_from_file(file_path: str) -> tuple:
     """Reads a csv file into a pandas data frame with Boolean entries.
 
@@ -520,37 +428,39 @@ def get_truth_table_from_file(file_path: str) -> tuple:
     level_factor_order_list.append([])   # declare lists for zeroth level
     level_factor_order_list[0].append([])  # zeroth order
 
-    order_information = "" # variable to mark the row that contains the information on the causal and constitution ordering
-
-    formula = ""
-    # go through the data frame and get the respective logical formula
-    for index, row in df.iterrows():
-        formula_row = ""
-        for col in factor_list:
-            if row[col] in true_values:
-                formula_row = formula_row + "*" + col
-            elif row[col] in false_values:
-                formula_row = formula_row + "*~" + col
-            elif row[col] == "<" or row[col] == "<<":
+    order_information = None # variable to mark the row that contains the information on the causal and constitution ordering
+
+    disjuncts = [] # list of the rows as conjunctive formulae
+    # go through the data frame row by row, itertuples avoids building a pandas series for each row
+    for row in df.itertuples(index=False, name=None):
+        conjuncts = []
+        for col, value in zip(factor_list, row):
+            if value in true_values:
+                conjuncts.append(col)
+            elif value in false_values:
+                conjuncts.append("~" + col)
+            elif value == "<" or value == "<<":
                  # this row contains information on the causal and constitutional separation of the causal factors
-                 order_information = row
+                 order_information = dict(zip(factor_list, row))
+
+        if conjuncts:
+            disjuncts.append("*".join(conjuncts))
 
-        if formula_row != "":
-            # add the disjunctor for the next row
-            formula = formula + formula_row + " + "
+    formula = " + ".join(disjuncts)
 
-    if not(type(order_information) == str):
+    if order_information is not None:
         # categorise the causal factors
         level = 0 # start with level zero
         order = 0 # and order zero
         for col in factor_list:
-            if str(order_information[col]).find("<<") > -1:
+            order_mark = str(order_information[col]) # separator in the order row before col
+            if "<<" in order_mark:
                 # add new level
                 level_factor_order_list.append([])
                 level = level + 1
                 level_factor_order_list[level].append([]) # add zeroth order to the new level
                 order = 0
-            elif str(order_information[col]).find("<") > -1:
+            elif "<" in order_mark:
                 # add new causal phase for the current level
                 level_factor_order_list[level].append([])
                 order = order + 1
@@ -560,20 +470,11 @@ def get_truth_table_from_file(file_path: str) -> tuple:
         # no order information given -> all factors are of zeroth order and zeroth level
         level_factor_order_list[0][0].extend(factor_list)
 
-    # remove "*" at the beginning of each disjunct
-    formula = formula.replace(" *"," ")
-    # remove the leading "*" and the trailing " + "
-    formula = formula[1:-3]
     return level_factor_order_list, factor_list, formula
 
 def create_factor_ordering(level_factor_order_list: list) -> list:
-    # create level_factor_list
-    output = []
-    for lvl in range(len(level_factor_order_list)):
-        output.append([])
-        for order in level_factor_order_list[lvl]:
-            output[lvl].extend(order)
-    return output
+    # create level_factor_list: the factors of all causal orders of a level in one list per level
+    return [list(itertools.chain.from_iterable(lvl)) for lvl in level_factor_order_list]
 
 def suspension_search_asf(level_factor_order_list: list, formula_st: str) -> list:
     """Determines the list of atomic solution formulae using a breadth first
@@ -598,11 +499,14 @@ def suspension_search_asf(level_factor_order_list: list, formula_st: str) -> lis
         element[0] - DNF formula; element[1] - atomic
     """
 
+    # negation of every factor, built once instead of in each of the loops below
+    neg_factor = {factor: "~" + factor for factor in flatten_nested_list(level_factor_order_list)}
+
     data_table = []
     for index, line in enumerate(string_to_list(formula_st)):
         data_table.append({})
-        for factor in flatten_nested_list(level_factor_order_list):
-            if "~" + factor in line:
+        for factor in neg_factor:
+            if neg_factor[factor] in line:
                 data_table[index][factor] = False
             elif factor in line:
                 data_table[index][factor] = True
@@ -629,12 +533,9 @@ def suspension_search_asf(level_factor_order_list: list, formula_st: str) -> lis
         if lvl_index > 0:
             remove_list = [x for level in level_factor_order_list for order in level for x in order if lvl != level ]
             reduced_data_table = ss.reduce_data_table(data_table, remove_list)
-            new_formula = []
-            for line_index, line in enumerate(string_to_list(formula_st)):
-                new_formula.append([])
-                for lit in line:
-                    if any(fac == lit or "~" + fac == lit for fac in flatten_nested_list(level_factor_order_list[lvl_index])):
-                        new_formula[line_index].append(lit)
+            # literals of the factors of this level
+            keep_literals = {lit for fac in flatten_nested_list(level_factor_order_list[lvl_index]) for lit in (fac, neg_factor[fac])}
+            new_formula = [[lit for lit in line if lit in keep_literals] for line in string_to_list(formula_st)]
 
             nested_effects_list[lvl_index][0] = find_effects(new_formula, flatten_nested_list(level_factor_order_list[lvl_index]))
 
@@ -674,12 +575,9 @@ def suspension_search_asf(level_factor_order_list: list, formula_st: str) -> lis
                         remove_list.extend(nested_effects_list[i][0])
                 reduced_data_table = ss.reduce_data_table(data_table, remove_list)
                 nested_effects_list[lvl_index].append([])
-                new_formula = []
-                for line_index, line in enumerate(string_to_list(formula_st)):
-                    new_formula.append([])
-                    for lit in line:
-                        if any(fac == lit or "~" + fac == lit for fac in nested_effects_list[lvl_index][counter]):
-                            new_formula[line_index].append(lit)
+                # literals of the current effects of this level
+                keep_literals = {lit for fac in nested_effects_list[lvl_index][counter] for lit in (fac, neg_factor[fac])}
+                new_formula = [[lit for lit in line if lit in keep_literals] for line in string_to_list(formula_st)]
                 nested_effects_list[lvl_index][counter+1] = find_effects(new_formula, nested_effects_list[lvl_index][counter])
 
             counter += 1
@@ -892,7 +790,7 @@ def read_data_from_csv(file_path: str, mode: str = "td") -> tuple:
             formula = string_to_list(formula_st)
 
             # determine which causal factors might be effects
-            effects_list = find_effects(string_to_list(formula_st),factor_list)
+            effects_list = find_effects(formula, factor_list)
 
             # check for co-extensive factors - only for one factor of each set of co-extensive factors,
             # the prime implicants have to be determined
@@ -913,55 +811,64 @@ def read_data_from_csv(file_path: str, mode: str = "td") -> tuple:
                                         else:
                                             effects_list.remove(factor)
 
-            for fac in effects_list:
-                # for each of these factors:
-                # determine its instance formula (the min-term equivalence formula to fac)
-                i_formula = get_instance_formula_to_factor(string_to_list(formula_st), fac, level_factor_order_list)
-
-
-                # determine the prime implicants of this instance formula
-                pi_list = get_prime_implicants(i_formula, fac, level_factor_order_list)
-
-                if pi_list:
-                    # list of prime implicants is non-empty
-                    # obtain all possible transformations of the instance formula into the reduced disjunctive normal form
-                    for sol in get_rdnf(pi_list, i_formula, level_factor_order_list):
-                        # since sol is equivalent to fac, append the equivalence-operator and the second equivalent (fac)
-                        sol = sol + " <-> " + fac
-                        list_equiv_formula.append(sol)
+            # the min-term formula is parsed only once above and shared by all factors,
+            # the factors are independent of each other, hence their equivalence formulae are derived
+            # in parallel by a pool of worker processes if the truth table is large enough to make up for
+            # starting the workers, the results are collected in the order of effects_list
+            num_processes = min(len(effects_list), os.cpu_count() or 1)
+            if num_processes > 1 and len(formula) >= PARALLEL_MIN_TERMS:
+                # multiprocessing is only imported when a pool is started, so sequential runs and
+                # spawned processes that import this module do not pay for it
+                import multiprocessing
+                # every worker receives its factors in one chunk, such that the shared min-term formula
+                # is pickled once per worker instead of once per factor
+                chunk_size = -(-len(effects_list) // num_processes)
+                with multiprocessing.Pool(num_processes) as pool:
+                    results = pool.starmap(get_equiv_formulae_to_factor, \
+                                           [(formula, fac, level_factor_order_list) for fac in effects_list], chunk_size)
+            else:
+                results = [get_equiv_formulae_to_factor(formula, fac, level_factor_order_list) for fac in effects_list]
+            for equiv_formulae in results:
+                list_equiv_formula.extend(equiv_formulae)
 
             # add equivalence relations for coextensive factors
             if list_of_coextensives:
+                # index of the equivalence formulae by their effect (right-hand side), new formulae are added to it as well,
+                # so only the formulae of effect are visited instead of the whole list for every coextensive factor
+                formulae_by_effect = {}
+                for formula in list_equiv_formula:
+                    formulae_by_effect.setdefault(formula.rsplit(" <-> ", 1)[1], []).append(formula)
                 for effect in effects_list:
                     for sublist in list_of_coextensives:
                         if effect in sublist:
                             for fac in sublist:
                                 if not(fac in effects_list) and not (fac == effect) and (get_factor_level(fac, level_factor_order_list) == get_factor_level(effect, level_factor_order_list)):
+                                    fac_order = get_factor_order(fac, level_factor_order_list)
+                                    # factors of higher causal order than fac (except for effect)
+                                    higher_factors = [f for index, order in enumerate(level_factor_order_list[get_factor_level(fac, level_factor_order_list)]) \
+                                                      if index > fac_order for f in order if f != effect]
+                                    # single alternation of all higher factors, so that each formula is scanned once
+                                    # instead of once per higher factor
+                                    if higher_factors:
+                                        higher_factors_pattern = re.compile("|".join(re.escape(f) for f in higher_factors))
+                                    else:
+                                        higher_factors_pattern = None
+                                    lgth = len(effect)
                                     # replace effect by fac and vice versa in the equivalence formulae for effect
-                                    for formula in list_equiv_formula:
-                                        lgth = len(effect)
-                                        if formula.endswith(effect):
-                                            # skip formula if cause-term contains factor of higher causal order than fac
-                                            skip = False
-                                            # case 1: fac is cause and effect of higher order than fac
-                                            if (formula.find(fac) > -1) and (get_factor_order(fac, level_factor_order_list) < get_factor_order(effect, level_factor_order_list)):
-                                                skip = True
-                                            # case 2: another factor of higher order than fac is among causes
-                                            if not(skip):
-                                                for index, order in enumerate(level_factor_order_list[get_factor_level(fac, level_factor_order_list)]):
-                                                    if index > get_factor_order(fac, level_factor_order_list):
-                                                        for f in order:
-                                                            if (f != effect) and (formula.find(f) > -1):
-                                                                skip = True
-                                                                break # break from for-loop over factors
-                                                    if skip:
-                                                        break # break from for-loop over orders
-
-                                            if not(skip):
-                                                st = formula[:-lgth].replace(fac,effect) # the new formula is the old one without the last
-                                                st = st + fac # expression and with all occurences of fac replaced by effect
-                                                # then append fac as second equivalent of the equivalence formula
-                                                list_equiv_formula.append(st) # add the new formula to the formulae list
+                                    for formula in formulae_by_effect.get(effect, []):
+                                        # skip formula if cause-term contains factor of higher causal order than fac
+                                        # case 1: fac is cause and effect of higher order than fac
+                                        skip = (fac in formula) and (fac_order < get_factor_order(effect, level_factor_order_list))
+                                        # case 2: another factor of higher order than fac is among causes
+                                        if not(skip) and higher_factors_pattern:
+                                            skip = higher_factors_pattern.search(formula) is not None
+
+                                        if not(skip):
+                                            st = formula[:-lgth].replace(fac,effect) # the new formula is the old one without the last
+                                            st = st + fac # expression and with all occurences of fac replaced by effect
+                                            # then append fac as second equivalent of the equivalence formula
+                                            list_equiv_formula.append(st) # add the new formula to the formulae list
+                                            formulae_by_effect.setdefault(fac, []).append(st)
                             break # break from for-loop over sublists
 
             if list_equiv_formula:
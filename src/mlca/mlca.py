@@ -21,7 +21,8 @@ Relations between factors of different levels are not considered as causal but c
 
 import copy                        # for deep-copy of lists
 import itertools                   # itertools provides functions to obtain all permutations of a string and Cartesian products of lists
-import re                          # regex for complex search patterns in strings
+from collections import Counter    # counting of hashable elements, e.g. the number of causal relations per effect
+from collections.abc import Iterable # type of arguments that are only traversed, e.g. Cartesian products
 
 __all__ = ("is_transitive",
            "reduce_structural_redundancy",
@@ -41,7 +42,7 @@ __version__ = "0.3.1"
 from operator import itemgetter
 from utils import powerset, list_comparison, flatten_nested_list, find_causal_factors, \
     get_causal_prefactors, get_equiv_formula, get_components_from_formula, get_formula_level, \
-        get_factor_order, get_ordered_dnf_string, get_clusters, count_true
+        get_factor_order, get_ordered_dnf_string, get_clusters, count_true, SPACED_DISJUNCTOR_PATTERN
 
 def is_transitive(formula_list: list, factor_list: list) -> tuple[list, bool]:
     """Function that checks whether the list of causal relations is transitive for the causal factors
@@ -76,15 +77,17 @@ def is_transitive(formula_list: list, factor_list: list) -> tuple[list, bool]:
     order_factor_list = []
     # add (empty) zeroth order
     order_factor_list.append([])
+
+    # the formulae are indexed once by their right side, each right side factor is mapped to the list
+    # of the factors on the left side of every formula of which it is the right side
+    cause_factors_by_effect = {}
+    for formula in formula_list:
+        cause_factors_by_effect.setdefault(formula[1], []).append(get_components_from_formula(formula[0], factor_list))
     
     # run through factor_list and check for each factor
     # whether it is of zeroth order -> add it to order_factor_list[0]
     for fac_num in range(len(factor_list)-1,-1,-1):
-        first_order = True
-        for formula in formula_list:
-            if formula[1] == factor_list[fac_num]:
-                first_order = False
-                break
+        first_order = not(factor_list[fac_num] in cause_factors_by_effect)
         
         if first_order:
             order_factor_list[0].append(factor_list[fac_num])
@@ -113,6 +116,10 @@ def is_transitive(formula_list: list, factor_list: list) -> tuple[list, bool]:
             
         # create a list of all still non-categorised factors (= those that are causally down stream to the considered factors)
         downstream_factor_list = []
+
+        # the order of every categorised factor, such that it is looked up once instead of searching all sublists
+        # of order_factor_list again for every left side factor (a factor keeps the lowest order it has been assigned)
+        factor_order = {fac: 0 for fac in order_factor_list[0]}
                 
         # initially downstream_factor_list consists of those elements of level_factor_list[m], that are not of order 0
         for element in factor_list:
@@ -122,15 +129,15 @@ def is_transitive(formula_list: list, factor_list: list) -> tuple[list, bool]:
            
         # successively add to the list level_factor_list_order[m] those factors which appear on the right side of causal relation
         # whose left side factors are all already contained in level_factor_list_order[m]
-        # this is done through four nested loops:
+        # this is done through three nested loops and a look-up:
         # 1) a while loop that runs over the indexes of the elements of downstream_factor_list
         # it may have to pass the same element multiple times since it might be necessary to classify other factors first
         # 2) a for loop over all causal equivalence formulae
         # searches for formulae in which the considered factor is the right-side (atomic) term
         # check whether all factors appearing in the left side term have an order assigned, done using a third loop:
         # 3) a for loop over the causal factors that appear on the left side of the current formula
-        # 4) a for loop over all orders in level_factor_list_order to check whether the elements from 3) are already contained
-        # in one sublist
+        # 4) a look-up in factor_order to check whether the elements from 3) are already contained in one sublist
+        # of level_factor_list_order
 
         # traverse downstream_factor_list regressively (loop 1)
         j = len(downstream_factor_list) - 1
@@ -139,44 +146,37 @@ def is_transitive(formula_list: list, factor_list: list) -> tuple[list, bool]:
             # the current level_factor_list_order
             order = 0               # the order that will be given to downstream_factor_list[j]
                 
-            # loop 2 - for loop over all causal formulae
-            for formula in formula_list:
-                if formula[1] == downstream_factor_list[j] :
-                    # go through all formulae where element j is the right side term
-                    # then check whether in all of these formulae every factor on the left side has already an order assigned
-                    # if so, element j gets the max order + 1
-                    # if not, continue with the next element of downstream_factor_list
+            # loop 2 - for loop over all causal formulae of which element j is the right side term
+            for cause_factors in cause_factors_by_effect.get(downstream_factor_list[j], []):
+                # go through all formulae where element j is the right side term
+                # then check whether in all of these formulae every factor on the left side has already an order assigned
+                # if so, element j gets the max order + 1
+                # if not, continue with the next element of downstream_factor_list
+                    
+                order = 0 # order has to be reset to zero
+                    
+                # loop 3 - for loop over all factors on the left side of formula
+                for fac in cause_factors:
+                    fac_is_listed = fac in factor_order # is there already an order assigned to the currently considered factor fac?
                         
-                    order = 0 # order has to be reset to zero
+                    # look-up 4 - order of fac
+                    if fac_is_listed and order < factor_order[fac] + 1 :
+                        order = factor_order[fac] + 1 # the order of downstream_factor_list[j] is at least one higher than that of fac
                         
-                    # loop 3 - for loop over all factors on the left side of formula
-                    for fac in get_components_from_formula(formula[0], factor_list):
-                        fac_is_listed = False      # is there already an order assigned to the currently considered factor fac?
+                    if not(fac_is_listed) :
+                        classifiable = False   # if one source factor has no assigned order, the target factor is not (yet)
+                        # classifiable
+                        break                  # break from loop over factors, since one non-categorised factor suffices
                             
-                        # loop 4 - for loop over all orders
-                        for o in range(len(order_factor_list)) :
-                            if fac in order_factor_list[o] :
-                                fac_is_listed = True
-                                if order < o + 1 :
-                                    order = o + 1  # the order of downstream_factor_list[j] is at least one higher than that of fac
-                                      
-                                break              # break from loop over orders, if fac has already been found
-                        # end of loop 4 over orders        
+                    else :
+                        classifiable = True    # an order can be assigned to target factor j (given the current information)
                             
-                        if not(fac_is_listed) :
-                            classifiable = False   # if one source factor has no assigned order, the target factor is not (yet)
-                            # classifiable
-                            break                  # break from loop over factors, since one non-categorised factor suffices
-                                
-                        else :
-                            classifiable = True    # an order can be assigned to target factor j (given the current information)
-                                
-                    # end of loop 3 over factors of formula[0]
+                # end of loop 3 over factors of formula[0]
+                    
+                if not(classifiable) :
+                    break                      # break from loop over formulae after one has been found that turns out that
+                    # factor j is unclassifiable by now
                         
-                    if not(classifiable) :
-                        break                      # break from loop over formulae after one has been found that turns out that
-                        # factor j is unclassifiable by now
-                            
             # end of loop 2 over all causal relations
                 
             if classifiable :
@@ -194,6 +194,7 @@ def is_transitive(formula_list: list, factor_list: list) -> tuple[list, bool]:
                        
                     # j to the ordered factor list    
                     order_factor_list[order].append(downstream_factor_list[j])     
+                    factor_order.setdefault(downstream_factor_list[j], order)
                         
                     # and delete it from the unordered one
                     del downstream_factor_list[j]
@@ -442,9 +443,6 @@ def minimise_constitution_relations(level_factor_list_order: list, level: int, l
                 # if the color has been used for fac, the next factor gets a new color index        
                 color_index = color_index + 1
                 if color_index > 11 : color_index = 0 # after 11 colors, use the first one again
-                
-            # clear the auxiliary list    
-            auxiliary_list.clear()                        
                     
     # step III: discard constitution relations to terms that are middle terms of causal chains whose
     # upstream and downstream factors are also in a constitution relation with the considered higher level factor
@@ -495,9 +493,6 @@ def minimise_constitution_relations(level_factor_list_order: list, level: int, l
                 entry = (lfac, fac)
                 if not(entry in return_list) :
                     return_list.append(entry) 
-                
-            # clear the auxiliary list    
-            auxiliary_list.clear()
 
     return return_list, color_map, color_index
 
@@ -756,7 +751,7 @@ def read_input(file_name: str) -> tuple:
     input_from_cna = False
     input_from_qca = False
     
-    if file_lines[0].find("--- Coincidence Analysis (CNA) ---") > -1:
+    if "--- Coincidence Analysis (CNA) ---" in file_lines[0]:
         # CNA output starts with line "--- Coincidence Analysis (CNA) ---"
         input_from_cna = True
     
@@ -781,14 +776,14 @@ def read_input(file_name: str) -> tuple:
     if input_from_cna:  
         # Attention the following might change if the formatting of the cna output changes
         for i in range(len(file_lines)):  # search for the list of causal factors in the R output
-            if file_lines[i].find("Causal ordering:") > -1:
+            if "Causal ordering:" in file_lines[i]:
                 # case 1: if the factors are divided into several levels, cna prints "Causal ordering:"
                 # then the factors are listed in the subsequent line
                 st = file_lines[i+1].replace("Factors: ","") # deletes "Factors: " from line (if it occurs)
                 file_line_factors = i + 1                     # It will be helpful to know the line where the factors are listed. 
                 break                                         # leave for-loop after the line has been found
         
-            elif file_lines[i].find("Factors:") > -1:
+            elif "Factors:" in file_lines[i]:
                 # case 2: the R input does not include a separation of causal factors into different levels,
                 # then the output contains "Factors:" followed by the causal factors in the same line
                 st = file_lines[i].replace("Factors: ","") # deletes "Factors: " from line (if it occurs)
@@ -802,13 +797,13 @@ def read_input(file_name: str) -> tuple:
         # check whether it has been added manually
         file_line_factors = -1
         for i in range(len(file_lines)):
-            if file_lines[0].find("ordering") > -1:
+            if "ordering" in file_lines[0]:
                 file_line_factors = i
                 break
         
         if file_line_factors > -1:
             # case A: it has been manually added with the ordering information (using "print("ordering = ..."" in the R-script)
-            st = re.split("=",file_lines[file_line_factors])[1]        # keep only text after " ... ordering ="
+            st = file_lines[file_line_factors].split("=", 2)[1]        # keep only text after " ... ordering ="
             st = st.strip().rstrip()                                   # remove leading and trailing spaces
             st = st[:-1]                                               # remove trailing '"'
             level_count = file_lines[file_line_factors].count("<") + 1 # level_count = number of constitutive levels
@@ -819,7 +814,7 @@ def read_input(file_name: str) -> tuple:
             for line in file_lines:
                 if line.count("<->") == 1: 
                     # "<->" symbolises equivalence operator
-                    aux_str = re.split(":",line)[1]  # QCA output lines start with "Mxx:", we have to get rid of this enumeration
+                    aux_str = line.split(":", 2)[1]  # QCA output lines start with "Mxx:", we have to get rid of this enumeration
                     formula = get_equiv_formula(aux_str)
                     # read all factors from formula, add them to aux_fac_list if they aren't already elements
                     # 1) right-side term (is always atomic)
@@ -827,10 +822,10 @@ def read_input(file_name: str) -> tuple:
                         aux_fac_list.append(formula[1])
                     # 2) factors from left-side term (always disjunctive normal forms)
                     # decompose formula by first obtaining list of all disjuncts
-                    disj_list = re.split(r'\s\+\s', formula[0]) # create list of all disjuncts of left term from formula
+                    disj_list = SPACED_DISJUNCTOR_PATTERN.split(formula[0]) # create list of all disjuncts of left term from formula
                     for disj in disj_list:
                         # split every disjunct into its conjuncts (which are atomic or negations of atomic terms)
-                        conj_list = re.split(r'\*', disj)
+                        conj_list = disj.split("*")
                         for element in conj_list:
                             if element[0] == "~":
                                 element = element[1:]          # remove negators
@@ -863,16 +858,18 @@ def read_input(file_name: str) -> tuple:
                 # exactly one "<->" has been found in the line
                 # read the partial formulae on its left and right side and add them to equiv_list
                 if input_from_qca:
-                    line = re.split(":",line)[1]  # QCA output lines start with "Mxx:", we have to get rid of this enumeration
+                    line = line.split(":", 2)[1]  # QCA output lines start with "Mxx:", we have to get rid of this enumeration
                     equiv_list.append(get_equiv_formula(line)) 
-                elif not(re.search(r'^[A-Z]\s{2,}', line)): 
+                elif not("A" <= line[:1] <= "Z" and line[1:2].isspace() and line[2:3].isspace()): 
                     # cna sometimes contains csf with only one equivalence operator, these start with an uppercase letter and several spaces, ignore these lines
+                    # (the first character and the two following ones are tested directly instead of by a regex)
                     
                     
                     #MARKER: re.sub Does not work as expected. Why?
                     # hotfix:
-                    if get_equiv_formula(line)[0].find('       ') == -1:
-                        equiv_list.append(get_equiv_formula(line)) 
+                    equiv = get_equiv_formula(line) # derived once for the check and the list
+                    if not('       ' in equiv[0]):
+                        equiv_list.append(equiv) 
      
         if not(equiv_list) :  # if equiv_list is empty 
             print("Abort no formula has been found in " + file_name)
@@ -885,7 +882,7 @@ def read_input(file_name: str) -> tuple:
                 i = 0
                 found = False
                 while not(found) and i < len(equiv_list):
-                    found = (equiv_list[i][0].find(factor_list[k]) > -1 or equiv_list[i][1] == factor_list[k])
+                    found = (factor_list[k] in equiv_list[i][0] or equiv_list[i][1] == factor_list[k])
                     i = i + 1
                     
                 if not(found):  # since the for-loop is regressive, it should be no problem to remove the elements from the list
@@ -899,12 +896,12 @@ def read_input(file_name: str) -> tuple:
             if level_count > 1: # multi-level case
                 for i in range(level_count):
                     if input_from_cna:
-                        st = re.split(" < ",file_lines[file_line_factors])[i].strip()
+                        st = file_lines[file_line_factors].split(" < ")[i].strip()
                     elif input_from_qca:
-                        st = re.split("=",file_lines[file_line_factors])[1] # remove leading " ... ordering =" from line
+                        st = file_lines[file_line_factors].split("=", 2)[1] # remove leading " ... ordering =" from line
                         st = st.strip().rstrip()                            # remove leading and trailing spaces
                         st = st[:-1]                                        # remove trailing '"'
-                        st = re.split(" < ",st)[i].strip()
+                        st = st.split(" < ")[i].strip()
                     level_factor_list.append(find_causal_factors(st))
             else :   # single-level case
                 level_factor_list.append(factor_list)                       # just use factor_list
@@ -1077,16 +1074,8 @@ def reduce_redundancies(level_factor_list: list, level_equiv_list: list) -> tupl
         # avoid problems with Cartesian products of lists and tuples
         # make sure that every component is a list
         
-        local_list = list(itertools.product(*reduced_solutions))
-        aux_list = []
-        counter = 0
-        for sol in local_list:                
-            aux_list.append([])
-            for term in sol:
-                aux_list[counter].append(term)
-            counter = counter + 1
-
-        reduced_solutions = aux_list
+        # the product is consumed directly, every combination is converted into a list
+        reduced_solutions = [list(sol) for sol in itertools.product(*reduced_solutions)]
 
     elif level_count == 1:
         # flatten list 
@@ -1138,13 +1127,14 @@ def find_conflicting_formulae(solution: list) -> dict:
     
     return dict_effect_cause
             
-def convert_tuple_list_to_nested_list(in_list: list) -> list:
+def convert_tuple_list_to_nested_list(in_list: Iterable) -> list:
     """Transforms lists of tuples into a nested list and returns the nested list.
 
     Parameters
     __________
-    in_list : list
-        list of tuples or nested list
+    in_list : iterable
+        list of tuples or nested list, or an iterator of tuples such as a Cartesian product
+        from itertools.product, it is traversed once
 
     Returns
     _______
@@ -1152,17 +1142,17 @@ def convert_tuple_list_to_nested_list(in_list: list) -> list:
         a nested list, in case that in_list is a list of tuples, the tuples are transformed
         into sublists
     """
-    counter = 0
+    # the nesting depth is fixed: sublists are unpacked by exactly one level,
+    # all other terms (formulae in form of tuples) are taken over as they are
     aux_list = []
-    for sol in in_list:                
-        aux_list.append([])
+    for sol in in_list:
+        new_sol = []
         for term in sol:
             if isinstance(term, list):
-                for el in term:
-                    aux_list[counter].append(el)
+                new_sol.extend(term)
             else:
-                aux_list[counter].append(term)
-        counter = counter + 1  
+                new_sol.append(term)
+        aux_list.append(new_sol)
     return aux_list
     
 def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode: list = ["bw","simple"], \
@@ -1218,8 +1208,9 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
     virtual_level_dict = {} # dictionary that assigns the ordinal number of the corresponding virtual levels to each real level (e.g. virtual_level_dict[2] = [4, 5, 6])
     vl_counter = 0
     for lvl in range(len(in_level_factor_list)):
-        level_factor_list.extend(get_clusters(in_level_equiv_list[lvl], in_level_factor_list[lvl]))
-        num_clust_lvl = len(get_clusters(in_level_equiv_list[lvl], in_level_factor_list[lvl])) # number of causally unconnected clusters of causal factors in constitutive level lvl
+        clusters_lvl = get_clusters(in_level_equiv_list[lvl], in_level_factor_list[lvl])
+        level_factor_list.extend(clusters_lvl)
+        num_clust_lvl = len(clusters_lvl) # number of causally unconnected clusters of causal factors in constitutive level lvl
         if num_clust_lvl > 1:
             virtual_level_dict[lvl] = []
             for i in range(0, num_clust_lvl):
@@ -1280,9 +1271,9 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
                     for sec_formula in level_equiv_list[m]:
                         if (formula[1] == sec_formula[0] and sec_formula[1] == formula[0]) or (sec_formula[0] == '~' + formula[1] and formula[0] == '~' + sec_formula[1]):
                             # pair of circular formulae found
-                            if not(formula in circular_list):
+                            if formula not in circular_list:
                                 circular_list.append(formula)
-                            if not(sec_formula in circular_list):
+                            if sec_formula not in circular_list:
                                 circular_list.append(sec_formula)
                            
                                 
@@ -1302,13 +1293,17 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
             #     of causal relations
                 
             # create a list of all causal factors of circular sub-structures
+            # (the set is kept alongside the ordered list for membership tests)
             list_circular_factors = []
+            set_circular_factors = set()
             for formula in circular_list:
                 for fac in get_components_from_formula(formula[0], level_factor_list):
-                    if not(fac in list_circular_factors):
+                    if fac not in set_circular_factors:
                         list_circular_factors.append(fac)
-                if not(formula[1] in list_circular_factors):
+                        set_circular_factors.add(fac)
+                if formula[1] not in set_circular_factors:
                         list_circular_factors.append(formula[1])
+                        set_circular_factors.add(formula[1])
            
                 
             # form the powerset of the circular formulae                 
@@ -1317,7 +1312,7 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
             for num in range(len(new_circular_list)-1,-1,-1):
                 # i) accept only transitive solutions (non-circular)
                 transitive, _ = is_transitive(new_circular_list[num],list_circular_factors)
-                if not(transitive):
+                if not transitive:
                     del new_circular_list[num]
                     
                 else:
@@ -1341,7 +1336,7 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
                     
                     keep_solution_step_ii = True
 
-                    if not(single_path):
+                    if not single_path:
                         
                         if "simple" in mode:
                             # in simple mode discard these solutions
@@ -1370,10 +1365,7 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
                             
                             
                                 # (1) A <-> C, ..., B <-> C => A*...*B <-> C
-                                formula_left = ''
-                                for cause in cause_list[effect]:
-                                    formula_left = formula_left + cause + "*"
-                                formula_left = formula_left[:-1] # remove the trailing "*"
+                                formula_left = "*".join(cause_list[effect])
                                 # formula_left will be ordered to facilitate later comparison for duplicates
                                 formula_left = get_ordered_dnf_string(formula_left)
                                 formula = (formula_left, effect)
@@ -1389,11 +1381,11 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
                                 if (fac in get_components_from_formula(formula[0], list_circular_factors)) or fac == formula[1]:
                                     f_complete = True
                                     break
-                            if not(f_complete):
+                            if not f_complete:
                                 complete = False
                                 break
                     
-                        if not(complete):
+                        if not complete:
                             del new_circular_list[num]
                             keep_solution_step_ii = False
                             
@@ -1412,7 +1404,7 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
                             # check whether new_list_of_connected is equal to list_of_connected
                             # this is done by directly comparing the sorted lists with sorted sublists      
                                 
-                            if not(list_comparison(list_of_connected, new_list_of_connected)):
+                            if not list_comparison(list_of_connected, new_list_of_connected):
                                 del new_circular_list[num]
                                 keep_solution_step_ii =False
                     
@@ -1427,23 +1419,37 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
             # Applying (2c) is to construct every combination of disjunctors and conjunctors (so replacing some disjunctors by conjunctors).
             # Applying (2d) is to append further conjuncts to each disjunct.
             
+            # the solutions are sorted by the second element of their formulae (the effect) already here,
+            # such that the copies in additional_circular inherit this order
+            for sol in new_circular_list:
+                sol.sort(key=itemgetter(1))
+
             # a list for additional formulae to new_circular_list - it will be added later
             additional_circular = []
             for sol in new_circular_list:
                 loc_term_list = []
                 for id_term in range(len(sol)):
-                    if sol[id_term][0].find("*") > -1:
+                    if "*" in sol[id_term][0]:
                         new_formula = (sol[id_term][0].replace("*"," + "), sol[id_term][1])
                         loc_term_list.append(new_formula)
                     else:
                         loc_term_list.append(sol[id_term])
                 additional_circular.append(loc_term_list)
+            num_sorted = len(additional_circular) # number of leading solutions in additional_circular that are already sorted
+            known_circular = {tuple(sol) for sol in additional_circular} # the solutions of additional_circular as tuples
             
+            # whether a formula contains a disjunctor is determined only once per formula
+            disjunctive = {}
             for sol in additional_circular:
                 dis_terms = [] # list of all terms of sol that contain disjunctors
+                sol_base = []  # list of all terms of sol that do not contain disjunctors
                 for term in sol:
-                    if term[0].find("+") > -1:
+                    if term not in disjunctive:
+                        disjunctive[term] = "+" in term[0]
+                    if disjunctive[term]:
                         dis_terms.append(term)
+                    else:
+                        sol_base.append(term)
                         
                 
                 if len(dis_terms) > 0:
@@ -1458,8 +1464,9 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
                         list_of_factors = get_components_from_formula(dis_terms[i][0], level_factor_list)
                         
                         local_sol.append([]) # add a new sublist for the i-th term of sol      
+                        append_local = local_sol[i].append
                         # now fill this sublist with all combinations of disjunctors and conjunctors in the respective term:
-                        for j in range(2**dis_terms[i][0].count("+")):
+                        for id_for in range(2**dis_terms[i][0].count("+")):
                             # create 2^#disjunctors entries
                             # formulae will be numbered by a binary scheme
                             # junctors no.
@@ -1470,24 +1477,22 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
                             # ...
                             # **...*** 2^#disjunctors - 1
                             
-                            # start all with first factor - junctors and further factors will be added incrementally
-                            local_sol_f = (list_of_factors[0], dis_terms[i][1])
-                            local_sol[i].append(local_sol_f)
-                        
-                        for id_for in range(len(local_sol[i])):
-                            # loop over all formulae
+                            # start with first factor - junctors and further factors are collected in formula_parts
+                            # and joined once, instead of rebuilding the formula for every factor
+                            formula_parts = [list_of_factors[0]]
                             counter_for = id_for
                             for id_fac in range(1,len(list_of_factors)):
-                                # for loop over the factors in the formula, except the first one, which has been already
-                                # added to every new_formula
+                                # for loop over the factors in the formula, except the first one
                                 counter_fac = len(list_of_factors) - id_fac - 1 # reverse the numbering of factors (second becomes
                                 # last etc.)
                                 if counter_for >= 2**counter_fac:
                                     # decide whether the factor id_fac is to be joined via conjunction or disjunction
-                                    local_sol[i][id_for] = (local_sol[i][id_for][0] + "*" + list_of_factors[id_fac], dis_terms[i][1])
+                                    formula_parts.append("*")
                                     counter_for = counter_for - 2**counter_fac
                                 else:
-                                    local_sol[i][id_for] = (local_sol[i][id_for][0] + " + " + list_of_factors[id_fac], dis_terms[i][1])
+                                    formula_parts.append(" + ")
+                                formula_parts.append(list_of_factors[id_fac])
+                            append_local(("".join(formula_parts), dis_terms[i][1]))
                         
                         # By now (2b) and (2c) are done. All necessary formulae became elements of local_sol[i].
                         # Continuing with (2d):
@@ -1495,15 +1500,18 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
                         # Form every possible disjunct between atomic and maximal conjunct (A, A*B, A*B*C, ...)
                         # But take care that no disjunct becomes a subset of another disjunct (NOT A*B + B + ...)
                         # Also take substitutions by further formulae into account.
+                        # the formulae already in local_sol[i] are recorded in their ordered form, such that a new formula
+                        # is discarded in one look-up if it only differs from a known one by the order of disjuncts or conjuncts
+                        known_formulae = {get_ordered_dnf_string(formula[0]) for formula in local_sol[i]}
                         for formula in local_sol[i]:
                             # run over all formula in local_sol[i] to check for eligible disjunctive formulae
-                            if formula[0].find("+") > -1:
+                            if "+" in formula[0]:
                                 # only proceed with formula if it contains at least one disjunctor
                                 
-                                f_disj_list = re.split(r'\s\+\s', formula[0]) # create list of all disjuncts of formula
+                                f_disj_list = SPACED_DISJUNCTOR_PATTERN.split(formula[0]) # create list of all disjuncts of formula
                                 
                                 # nested list f_conj_list[DISJUNCT][CONJUNCT IN DISJUNCT]
-                                f_conj_list = conj_list = [re.split(r'\*', disj) for disj in f_disj_list] 
+                                f_conj_list = conj_list = [disj.split("*") for disj in f_disj_list] 
                                 new_disj_list_2d = [] # list of additional terms due to rule (2d)
                                 # this list will be nested new_disj_list_2d[DISJUNCT][CONJUNCT]
                                 
@@ -1511,93 +1519,65 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
                                     new_disj_list_2d.append([]) # create empty entry for next disjunct
                                     
                                     # the list of factors that can be added as further conjuncts
-                                    fac_to_be_added = [fac for fac in list_of_factors if not(fac in f_conj_list[id_disj])]
+                                    fac_to_be_added = [fac for fac in list_of_factors if fac not in f_conj_list[id_disj]]
                                     
                                     # the list of all possible forms between atomic and the maximal conjunct is determined
-                                    # by using the Cartesian product of the present factor and the powerset of fac_to_be_added
-                                    aux_list_2d = [[sublist_1, sublist_2] for (sublist_1, sublist_2) in itertools.product([f_conj_list[id_disj]], powerset(fac_to_be_added))]
-                                    # structure of this set: e.g. for A + B + C -> [[[['A'], []], [['A'], ['B]], [['A'], ['C']], [['A'], ['B', 'C']]], [[['B'], []] ...] ... ]
-                                    
-                                    # flatten the inner lists (e.g. [['A'], []] -> ['A'] and [['A'], ['B','C']] -> ['A','B','C']
-                                    sec_aux_list_2d = []
-                                    for id_element in range(len(aux_list_2d)):
-                                        sec_aux_list_2d.append([])
-                                        for ij in range(2):
-                                            for subelement in aux_list_2d[id_element][ij]:
-                                                sec_aux_list_2d[id_element].append(subelement)
-                                        sec_aux_list_2d[id_element].sort()
-                                    
-                                    # add these newly obtained disjuncts to the list of complete terms
-                                    new_disj_list_2d[id_disj].extend(sec_aux_list_2d)
+                                    # by joining the present factor with every element of the powerset of fac_to_be_added
+                                    # e.g. for A + B + C -> [['A'], ['A', 'B'], ['A', 'C'], ['A', 'B', 'C']] for the first disjunct
+                                    # every form is stored together with the set of its conjuncts, such that the set is built
+                                    # once per form instead of once per comparison below
+                                    for subset in powerset(fac_to_be_added):
+                                        element_2d = sorted([*f_conj_list[id_disj], *subset])
+                                        new_disj_list_2d[id_disj].append((element_2d, frozenset(element_2d)))
                                     
                                 # the totality of new DNF formulae is the Cartesian product of all variants for each disjunct
-                                sec_new_disj_list_2d = [list(x) for x in list(itertools.product(*new_disj_list_2d))]
-                                    
-                                # now discard all invalid formulae = one disjunct is a subset of another disjunct
+                                # discard all invalid formulae = one disjunct is a subset of another disjunct
                                 # e.g.: 
                                 # A*B + A*B*C
-                                for e_counter in range(len(sec_new_disj_list_2d)-1,-1,-1):
-                                    # run through the list and check for every term individually
-                                    invalid = False
-                                    for d_counter_1 in range(len(sec_new_disj_list_2d[e_counter])):
-                                        # for every disjunct in the term
-                                        for d_counter_2 in range(len(sec_new_disj_list_2d[e_counter])):
-                                            # compare with each other disjunct
-                                            if d_counter_1 != d_counter_2:
-                                                # whether it is a subset of the other
-                                                if set(sec_new_disj_list_2d[e_counter][d_counter_1]).issubset(sec_new_disj_list_2d[e_counter][d_counter_2]):
-                                                    # if True, then discard this term
-                                                    invalid = True
-                                                    break
-                                                    
-                                                
-                                        if invalid:
-                                            break
-                                    if invalid:
-                                        del sec_new_disj_list_2d[e_counter]
+                                sec_new_disj_list_2d = []
+                                for term in itertools.product(*new_disj_list_2d):
+                                    if not any(d_counter_1 != d_counter_2 and set_1 <= set_2 \
+                                               for d_counter_1, (_, set_1) in enumerate(term) for d_counter_2, (_, set_2) in enumerate(term)):
+                                        sec_new_disj_list_2d.append([disj for disj, _ in term])
                                 # add formulae in sec_new_disj_list to local_sol[i]
                                 for new_term in sec_new_disj_list_2d:
                                     # convert each new_term into a string of logical formula
-                                    str_formula = ""
-                                    for disj in new_term:
-                                        if str_formula != "":
-                                            str_formula = str_formula + " + "
-                                        
-                                        for conj in disj:
-                                            str_formula = str_formula + conj + "*"
-                                            
-                                        str_formula = str_formula[:-1]
-                                    
-                                    
+                                    str_formula = " + ".join(["*".join(disj) for disj in new_term])
                                     
                                     # add the newly obtained term to local_sol[i] if it is not already contained
-                                    compl_formula = (str_formula, dis_terms[i][1])
-                                    if not(compl_formula in local_sol[i]):
-                                        local_sol[i].append(compl_formula)
+                                    ordered_formula = get_ordered_dnf_string(str_formula)
+                                    if ordered_formula not in known_formulae:
+                                        known_formulae.add(ordered_formula)
+                                        append_local((str_formula, dis_terms[i][1]))
                         
                         
                         
-                    # form Cartesian of all sublists of local_sol and the unchanged terms
-                    sol_base = [x for x in sol if x[0].find("+") == -1] # list of all terms of sol that do not contain disjunctors
-
-                    # and are the common core of every result for sol
+                    # form Cartesian of all sublists of local_sol and the unchanged terms of sol_base,
+                    # which are the common core of every result for sol
                     if len(sol_base) > 0:
                         # add the Cartesian product of sol_base and all sublists of local_sol to
                         # additional_circular if they are not already contained therein
-                        additional_circular.extend([[*line] for line in itertools.product(*local_sol,sol_base) if not([*line] in additional_circular)])
+                        product_lines = itertools.product(*local_sol,sol_base)
                     else:
                         # in case that the common core is empty, add the Cartesian product of all sublists of local_sol to
                         # additional_circular if they are not already contained therein
-                        additional_circular.extend([[*line] for line in itertools.product(*local_sol) if not([*line] in additional_circular)])
+                        product_lines = itertools.product(*local_sol)
+                    
+                    # the membership test is done with the set of known solutions, the new ones are added in one batch
+                    new_lines = []
+                    for line in product_lines:
+                        if line not in known_circular:
+                            known_circular.add(line)
+                            new_lines.append(list(line))
+                    additional_circular.extend(new_lines)
 
             # add additional terms without duplicates to new_circular_list          
-            # reconstruct new
-            for sol in new_circular_list:
-                sol.sort(key=itemgetter(1)) # sort by second element of the tuple sol
-                
-            for sol in additional_circular:
-                sol.sort(key=itemgetter(1)) # sort by second element of the tuple sol
-                if not(sol in new_circular_list):
+            # only the solutions obtained from the Cartesian products still have to be sorted
+            for id_sol in range(len(additional_circular)):
+                sol = additional_circular[id_sol]
+                if id_sol >= num_sorted:
+                    sol.sort(key=itemgetter(1)) # sort by second element of the tuple sol
+                if sol not in new_circular_list:
                     new_circular_list.append(sol)
                                 
             ########################################################################################
@@ -1608,23 +1588,23 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
             # each solution can only contain one of this set of causal relations
             
             # check whether there are multiple causal paths to the same factor -> all but one should be discarded
-            list_fac = []
             list_redundant_equiv = []
             list_unique_equiv = []
             
             # list_redundant_fac will contain the effects for which several causal relations exist
+            # (in the order in which their second causal relation appears)
             list_redundant_fac = []
+            effect_count = Counter()
             for formula in level_equiv_list[m]:
-                if formula[1] in list_fac and not(formula[1] in list_redundant_fac):
+                effect_count[formula[1]] += 1
+                if effect_count[formula[1]] == 2:
                     list_redundant_fac.append(formula[1])
-                elif not(formula[1] in list_fac):
-                    list_fac.append(formula[1])
             
             # delete factors whose multiple formulae are completely covered by circular_list
             for index in range(len(list_redundant_fac)-1,-1,-1):
                 all_circular = True
                 for formula in level_equiv_list[m]:
-                    if formula[1] == list_redundant_fac[index] and not(formula in circular_list):
+                    if formula[1] == list_redundant_fac[index] and formula not in circular_list:
                         all_circular = False
                         break
                 if all_circular:
@@ -1642,7 +1622,7 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
                 for fac in list_redundant_fac:
                     list_redundant_equiv.append([])
                     for formula in level_equiv_list[m]:
-                        if not(formula in circular_list) and formula[1] == fac:
+                        if formula not in circular_list and formula[1] == fac:
                             list_redundant_equiv[counter].append(formula)
                     counter = counter + 1
                 
@@ -1653,7 +1633,7 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
                             redundant = True
                             break
                     
-                    if not(redundant) and not(formula in circular_list):
+                    if not redundant and formula not in circular_list:
                         list_unique_equiv.append(formula)
                 
   
@@ -1665,7 +1645,7 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
             else:
                 # there are no redundant formulae
                 # all formulae from level_equiv_list[m] that are not elements of circular_list should go into unique_equiv
-                unique_equiv = [[formula for formula in level_equiv_list[m] if not(formula in circular_list)]]
+                unique_equiv = [[formula for formula in level_equiv_list[m] if formula not in circular_list]]
             
             #####################################################################
             # step 3D: compose a list of solutions for the constitutive level m #
@@ -1673,42 +1653,36 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
             # this will be the Cartesian product of list_redundant_equiv, new_circular_equiv and unique_equiv
             # in case that one or two of these lists are empty, different cases have to be distinguished:
             
+            # the Cartesian products are not materialised, but consumed directly when the solutions are composed
             if new_circular_list:
                 if list_redundant_equiv:
                     if unique_equiv:
-                        aux_list = list(itertools.product(*list_redundant_equiv,new_circular_list,unique_equiv))
+                        aux_list = itertools.product(*list_redundant_equiv,new_circular_list,unique_equiv)
                     else:
-                        if list_redundant_equiv:
-                            aux_list = itertools.product(*list_redundant_equiv,new_circular_list)
-
-                        else:
-                            aux_list = []
-                            aux_list.extend(new_circular_list)
+                        aux_list = itertools.product(*list_redundant_equiv,new_circular_list)
                 else:
                     if unique_equiv:
-                        aux_list = list(itertools.product(new_circular_list,unique_equiv))
+                        aux_list = itertools.product(new_circular_list,unique_equiv)
                     else:
-                        aux_list = []
-                        aux_list.extend(new_circular_list)
+                        aux_list = new_circular_list
             else:
                 if list_redundant_equiv:
                     if unique_equiv:
-                        aux_list = list(itertools.product(*list_redundant_equiv,unique_equiv))
+                        aux_list = itertools.product(*list_redundant_equiv,unique_equiv)
                     else:
-                        aux_list = list(itertools.product(*list_redundant_equiv))
+                        aux_list = itertools.product(*list_redundant_equiv)
                 else:
-                    aux_list = []
-                    aux_list.extend(unique_equiv)
+                    aux_list = unique_equiv
                 
             # avoid problems with Cartesian products of lists and tuples
-            # make sure that every component is a list
-            sec_aux_list = convert_tuple_list_to_nested_list(aux_list)
-            solutions_list[m].extend(sec_aux_list)
+            # make sure that every component is a list: formulae are taken over as they are,
+            # sublists of formulae are unpacked into the solution
+            solutions_list[m].extend(convert_tuple_list_to_nested_list(aux_list))
             
             # equations from redundant_equiv might have the same effect as formulae from the circular group
             # in this case one of both formulae has to be removed from the solution
             # first: check if both lists are non-empty and have an effect in common
-            if list_redundant_equiv and new_circular_list and set(list_redundant_fac) & set(list_circular_factors):
+            if list_redundant_equiv and new_circular_list and not set_circular_factors.isdisjoint(list_redundant_fac):
                 add_list = []
                 delete_list = []
                 for sol_counter in range(len(solutions_list[m])-1,-1,-1):
@@ -1720,26 +1694,28 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
                         # remove all formulae listed in dict_conflicts from solution
                         sol_copy = copy.deepcopy(solutions_list[m][sol_counter]) # deepcopy makes also copies of the elements which are lists again
                         conflicts = [] # transform dictionary into nested lists of tuples (cause, effect), grouped by common effect
-                        counter = 0
+                        remove_formula = sol_copy.remove
                         for effect in dict_conflicts:
-                            conflicts.append([])
+                            effect_conflicts = []
+                            append_conflict = effect_conflicts.append
                             for cause in dict_conflicts[effect]:
                                 del_formula = (cause, effect)
-                                sol_copy.remove(del_formula)
-                                conflicts[counter].append(del_formula)
+                                remove_formula(del_formula)
+                                append_conflict(del_formula)
                                 
-                            counter = counter + 1
+                            conflicts.append(effect_conflicts)
                                 
                         
                         # add all combinations from dict_conflicts to sol_copy such that it includes exactly one formula per effect
                         # -> Cartesian product of dict key lists
                         
+                        # the product is not materialised, it is consumed directly by convert_tuple_list_to_nested_list
                         if bool(sol_copy): # fragment of non-conflicting formulae in solution is non-empty
-                            local_add_list = list(itertools.product(*conflicts,[sol_copy])) # [sol_copy] == list with sol_copy as sole element
+                            local_add_list = itertools.product(*conflicts,[sol_copy]) # [sol_copy] == list with sol_copy as sole element
                         else:
-                            local_add_list = list(itertools.product(*conflicts))
+                            local_add_list = itertools.product(*conflicts)
                         
-                        local_nested_list = convert_tuple_list_to_nested_list(local_add_list) # transforms list of tuples (due to itertools.product) into nested lists
+                        local_nested_list = convert_tuple_list_to_nested_list(local_add_list) # transforms the tuples (due to itertools.product) into nested lists
                         
                         for local_sol in local_nested_list:
                             local_sol.sort(key=lambda x:x[1]) # sort order of formulae in solution by effect
@@ -1749,13 +1725,17 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
                 #delete_list = list(set(delete_list)) # get rid of duplicates
                 #add_list = list(set(add_list))
                 
-                for sol in delete_list:
-                    if sol in solutions_list[m]:
-                        solutions_list[m].remove(sol)
+                # membership is tested on tuples of the formulae of a solution, which can be hashed
+                # (every occurrence of a conflicting solution has been marked in delete_list)
+                delete_keys = {tuple(sol) for sol in delete_list}
+                solutions_list[m] = [sol for sol in solutions_list[m] if tuple(sol) not in delete_keys]
                     
                 if add_list: # add new solutions to solutions_list[m]
+                    sol_keys = {tuple(sol) for sol in solutions_list[m]}
                     for sol in add_list:
-                        if not(sol in solutions_list[m]):
+                        key = tuple(sol)
+                        if key not in sol_keys:
+                            sol_keys.add(key)
                             solutions_list[m].append(sol)
             
                         
@@ -1770,31 +1750,35 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
                     special_case = False
                     break
             
-            if not(special_case):
-                for i in range(len(solutions_list[m])-1,-1,-1):
-                    all_found = True
-                
-                    for fac in level_factor_list[m]:
-                        # test whether fac appears in level_equiv_list[m]
-                        fac_required = False
-                        if level_equiv_list[m]:
-                            for formula in level_equiv_list[m]:
-                                if formula[1] == fac or fac in get_components_from_formula(formula[0], level_factor_list):
-                                    fac_required = True
-                                    break
-                    
-                        if fac_required:
-                            fac_found = False
-                            for formula in solutions_list[m][i]:
-                                if formula[1] == fac or fac in get_components_from_formula(formula[0], level_factor_list):
-                                    fac_found = True
-                                    break
-                            if not(fac_found):
-                                all_found = False
-                                break
-                        
-                    if not(all_found):
-                        del solutions_list[m][i]
+            if not special_case:
+                # the components of a cause are needed for every solution and every factor,
+                # hence they are determined only once per distinct cause
+                components = {}
+                for formula in level_equiv_list[m]:
+                    if formula[0] not in components:
+                        components[formula[0]] = get_components_from_formula(formula[0], level_factor_list)
+                for sol in solutions_list[m]:
+                    for formula in sol:
+                        if formula[0] not in components:
+                            components[formula[0]] = get_components_from_formula(formula[0], level_factor_list)
+
+                # the factors of level m that appear in level_equiv_list[m] are required in every solution
+                required_facs = set()
+                for formula in level_equiv_list[m]:
+                    required_facs.add(formula[1])
+                    required_facs.update(components[formula[0]])
+                required_facs.intersection_update(level_factor_list[m])
+
+                # keep only those solutions that contain every required factor
+                complete_solutions = []
+                for sol in solutions_list[m]:
+                    covered_facs = set()
+                    for formula in sol:
+                        covered_facs.add(formula[1])
+                        covered_facs.update(components[formula[0]])
+                    if required_facs <= covered_facs:
+                        complete_solutions.append(sol)
+                solutions_list[m] = complete_solutions
         else:
             # there exists only one formula in level_equiv_list[m] or no formula at all -> it will surely not be redundant or circular
             solutions_list[m].append(level_equiv_list[m])             
@@ -1818,33 +1802,30 @@ def find_structures(in_level_factor_list: list, in_level_equiv_list: list, mode:
                 new_sublist = []
                 for v_lvl in virtual_level_dict[orig_lvl]:
                     new_sublist.append(solutions_list[v_lvl])
-                orig_solutions_list.append([])
-                orig_solutions_list[-1] = [list(x) for x in itertools.product(*new_sublist)]
-                
-                # flatten the second level of orig_solutions_list (by introducing new variable loc_list, which become the set-sum of orig_solutions_list[j] subsets)
-                for j in range(len(orig_solutions_list[-1])):
-                    loc_list = []
-                    for i in range(len(orig_solutions_list[-1][j])):
-                        loc_list = loc_list  + orig_solutions_list[-1][j][i]
-                
-                    orig_solutions_list[-1][j] = loc_list
+                # every combination of the partial solutions of the virtual levels is flattened
+                # directly into one list of formulae (the set-sum of the partial solutions)
+                orig_solutions_list.append([list(itertools.chain.from_iterable(x)) for x in itertools.product(*new_sublist)])
                
-        final_list = [[*row] for row in itertools.product(*orig_solutions_list)] # transform tuples back into a list   
+        final_list = [list(row) for row in itertools.product(*orig_solutions_list)] # transform tuples back into a list   
     
     else:
         # no virtual levels created
         # construct the Cartesian product of the partial solutions
-        final_list = [[*row] for row in itertools.product(*solutions_list)] # transform tuples back into a list   
+        final_list = [list(row) for row in itertools.product(*solutions_list)] # transform tuples back into a list   
     
 
     # find and delete duplicates
-    dublicate_list = []
-    for i in range(len(final_list)-1,-1,-1):
-        if final_list[i] in dublicate_list:
-            del final_list[i]
-        else:
-                dublicate_list.append(final_list[i])
-            
+    # the rows are compared as nested tuples in a set instead of searching every row in a list of the previous rows,
+    # which of several equal rows is kept does not matter since the list is sorted afterwards
+    known_rows = set()
+    unique_rows = []
+    for row in final_list:
+        row_key = tuple(tuple(part) for part in row)
+        if row_key not in known_rows:
+            known_rows.add(row_key)
+            unique_rows.append(row)
+    final_list = unique_rows
+
 
     final_list.sort()
     return final_list
@@ -1866,12 +1847,9 @@ def create_separate_formula_list(formula_list: list) -> None:
    
     output_file = "output_formula_list.tex" # define name of output file
     
-    # write the formulae to output_file
-    f = open(output_file, 'w')
-    for formula in formula_list:
-     f.write(formula)
-     f.write('\n')  # line break after each formula
-    f.close()      
+    # write the formulae to output_file in one go, with a line break after each formula
+    with open(output_file, 'w') as f:
+        f.writelines(formula + '\n' for formula in formula_list)
       
                     
 if __name__ == '__main__':
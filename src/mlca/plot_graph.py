@@ -7,21 +7,24 @@ are interpreted as causal and constitution relations. Hypergraphs are created us
 TeX.
 """
 
-import os                          # operating system interfaces is required to find the files in the local path
-import re                          # regex for complex search patterns in strings
+import subprocess                  # calling the Latex compiler
 import jinja2                      # Latex interface
-import codecs                      # for en- and decoding of strings (esp. to write tex-files in utf-8)
 from pathlib import Path           # navigating paths
 from datetime import datetime
+from functools import lru_cache    # caching of the compiled Latex templates
 
-from utils import get_components_from_formula, get_factor_level, get_factor_order, get_formula_level, get_formula_order
+from utils import get_components_from_formula, get_factor_index, DISJUNCTOR_PATTERN
 
 __all__ = ("convert_formula_to_tex_code",
            "convert_causal_relation",
            "convert_constitution_relation",
            "print_structure_in_tikz_plot",
+           "get_latex_template",
            "create_pdf")
 
+# translation table of the logical operators into their tex-syntax
+TEX_OPERATORS = str.maketrans({"*": " \\cdot ", "~": "\\neg "})
+
 # syntax definitions for Latex expressions
 latex_jinja_env = jinja2.Environment(
 	block_start_string = '\\BLOCK{',
@@ -49,15 +52,14 @@ def convert_formula_to_tex_code(solution: list) -> str:
         tex-code for writing solution as a logical formula
     """
 
-    tex_code = "$"
-    for lvl in solution:
-        for term in lvl:
-            tex_code = tex_code + "(" + term[0].replace("*", " \\cdot ").replace("~", "\\neg ") + "\\leftrightarrow " + term[1] + ")\\cdot"
-                        
-    tex_code = tex_code[:-5] + "$"  # remove the "\cdot" at the end of the last term
-    return tex_code
+    # translate conjunctors and negations in one pass over the left-side term
+    terms = ["(" + term[0].translate(TEX_OPERATORS) + "\\leftrightarrow " + term[1] + ")" for lvl in solution for term in lvl]
+    if not(terms):
+        return "$"
+    return "$" + "\\cdot".join(terms) + "$"
     
-def convert_causal_relation(formula: tuple, level_factor_list_order: list, tex_code: str, color: str, color_map: dict) -> str:
+def convert_causal_relation(formula: tuple, level_factor_list_order: list, tex_code: str, color: str, color_map: dict, \
+                            used_positions: set | None = None, factor_index: dict | None = None, declared_neg: set | None = None) -> str:
     """Translates a formula of causal relations into TikZ-Latex code
     Returns the code as string.
 
@@ -77,6 +79,16 @@ def convert_causal_relation(formula: tuple, level_factor_list_order: list, tex_c
         dictionary whose keys are 'draw' and 'text' for each factor, the values are
         the names of colors in which the nodes are drawn ('draw') and in which their
         labels are written ('text')
+    used_positions: set of str, optional
+        positions of the junction nodes in tex_code, it is updated by the positions of
+        the new junction nodes; if it is not given, tex_code is searched for the positions instead
+    factor_index: dict, optional
+        level and causal order of every factor in level_factor_list_order as obtained from
+        get_factor_index, it is determined from level_factor_list_order if it is not given
+    declared_neg: set of str, optional
+        factors whose negation nodes have already been declared in the hypergraph, it is
+        updated by the newly declared negation nodes; if it is not given, every negation
+        node is declared where it is used
 
     Returns
     _______
@@ -84,7 +96,20 @@ def convert_causal_relation(formula: tuple, level_factor_list_order: list, tex_c
         TikZ-Latex code corresponding to formula
     """
     
-    st = ""  # output code
+    st_parts = []  # output code, joined at the end
+    if used_positions is None:
+        scan_tex_code = True
+        used_positions = set()
+    else:
+        scan_tex_code = False
+    if factor_index is None:
+        factor_index = get_factor_index(level_factor_list_order)
+    if declared_neg is None:
+        # without record of the negation nodes, all of them are declared locally
+        declared_neg = set()
+        record_neg = False
+    else:
+        record_neg = True
     ###########################################
     # determine the syntactic type of formula #
     ###########################################
@@ -99,33 +124,42 @@ def convert_causal_relation(formula: tuple, level_factor_list_order: list, tex_c
     #    ( A + ~B*C + ... <-> E)
     
     
-    level = get_formula_level(formula[0], level_factor_list_order)
+    # factors in formula, determined once for all disjuncts
+    comps_formula = get_components_from_formula(formula[0], level_factor_list_order)
+    set_comps_formula = frozenset(comps_formula) # the same factors for membership tests
+    # level of formula, -1 if its factors are of different levels
+    formula_levels = {factor_index[fac][0] for fac in comps_formula}
+    level = formula_levels.pop() if len(formula_levels) == 1 else -1
     
     #######################################
     # equivalences with (negated) factors #
     #######################################
     
-    for o in range(len(level_factor_list_order[level])) :
-        for fac in level_factor_list_order[level][o] :
-            if fac == formula[0] :  # the left side of formula equals one factor from the factor list
-                st = "\\draw[->, " + color + "] (" + fac + ".east) -- (" + formula[1] + ".west);"
-                break    # stop after the factor has been found
-            elif formula[0] == "~" + fac : # the left side of formula equals the negation of one factor from the factor list
+    # the left side of formula is looked up directly among the factors of its level
+    if formula[0][:1] == "~":
+        fac = formula[0][1:]
+    else:
+        fac = formula[0]
+    if (fac in factor_index) and (factor_index[fac][0] == level % len(level_factor_list_order)):
+        if fac == formula[0] :  # the left side of formula equals one factor from the factor list
+            st_parts = ["\\draw[->, " + color + "] (" + fac + ".east) -- (" + formula[1] + ".west);"]
+        else : # the left side of formula equals the negation of one factor from the factor list
+            if not(fac in declared_neg):
                 color_neg = color_map["draw"][fac]
-                st = "\\node[neg, " + color_neg + "] (" + fac + "neg) at ([xshift=\\LNeg]" + fac + ".south east) {};\n\\draw[->, " + color + "] (" + fac + "neg) -- (" + formula[1] + ");"
-                break # stop after the factor has been found
+                st_parts.append("\\node[neg, " + color_neg + "] (" + fac + "neg) at ([xshift=\\LNeg]" + fac + ".south east) {};\n")
+                if record_neg:
+                    declared_neg.add(fac)
+            st_parts.append("\\draw[->, " + color + "] (" + fac + "neg) -- (" + formula[1] + ");")
                            
-    if st == "":
-        if formula[0].find("+") > -1 :
+    if not(st_parts):
+        if "+" in formula[0] :
         
             ################
             # disjunctions #
             ################
             
             # create a list of the possibly complex disjuncts of formula
-            disjunctor_list = re.split("\\s*\\+\\s*", formula[0])
-            
-            
+            disjunctor_list = DISJUNCTOR_PATTERN.split(formula[0])
             for disj in disjunctor_list : 
                 # running through this list
                 # each disjunct is tested whether it is
@@ -134,38 +168,35 @@ def convert_causal_relation(formula: tuple, level_factor_list_order: list, tex_c
                 # C) a negated causal factor
                 # each case is treated separately
 
-                if disj in get_components_from_formula(formula[0], level_factor_list_order):
+                if disj in set_comps_formula:
                     # case A: the discunct is one causal factor
                     
                     # a straight arrow is drawn from source factor.north east to target factor.west
-                    st = st + "% simple disjunction with shifted starting point\n"
-                    st = st + "\\draw[->, " + color + "] (" + disj + ".north east) to (" + formula[1] + ".west);\n"
+                    st_parts.append("% simple disjunction with shifted starting point\n")
+                    st_parts.append("\\draw[->, " + color + "] (" + disj + ".north east) to (" + formula[1] + ".west);\n")
                     
-                elif disj.find("*") > -1 :
+                elif "*" in disj :
                     # case B: the disjunct is a conjunction
-                    st = st + "% complex disjunction\n"
+                    st_parts.append("% complex disjunction\n")
                     
                     # first, the conjuncts are connected by curved lines meeting in one junction point
                     # placed one right (with a slight upward shift) to factor of the highest causal order
                     # second, this junction point is connected with the target factor by a straight arrow like
                     # in case A)
-                    conjunctor_list = re.split("\\*", disj)
+                    conjunctor_list = disj.split("*")
                     
                     # set the junction of the conjuncts
                     # place it beside the (first) conjunct of the highest causal order (the factor that is most to the right in the graph)
                     # find the corresponding node of that conjunct -- f_fac
-                    cross_point = ""                    # name of node of the junction of the conjunctions
-                    for fac in get_components_from_formula(disj, level_factor_list_order) :
-                        cross_point = cross_point + fac
-                        if fac == get_components_from_formula(disj, level_factor_list_order)[0] :
-                            f_fac = fac
-                        else :
-                            if get_factor_order(fac, level_factor_list_order) > get_factor_order(f_fac, level_factor_list_order) :
-                                f_fac = fac
-                    
-                    cross_point = cross_point + formula[1]
+                    comps_disj = get_components_from_formula(disj, level_factor_list_order) # factors in disj
+                    set_comps_disj = frozenset(comps_disj) # the same factors for membership tests
+                    # name of node of the junction of the conjunctions
+                    cross_point = "".join(comps_disj) + formula[1]
+                    # max returns the first of several conjuncts of the highest order
+                    f_fac = max(comps_disj, key=lambda fac: factor_index[fac][1])
+                    f_order = factor_index[f_fac][1]
                     
-                    if get_factor_order(f_fac, level_factor_list_order) < get_factor_order(formula[1], level_factor_list_order) :
+                    if f_order < factor_index.get(formula[1], (-1, -1))[1] :
                         # this is the normal non-circular case
                         position = "at ([xshift=\\hDisjConj, yshift=\\vDisjConj]" + f_fac + ".east)"
                         circular = False
@@ -179,7 +210,7 @@ def convert_causal_relation(formula: tuple, level_factor_list_order: list, tex_c
                     # Attention: It might happen that several disjuncts of conjuncts meet at the same factor f_fac,
                     # therefore we have to check whether the position of the junction node has to be shifted.
                     q = 1
-                    while (tex_code.find(position) > -1) or (st.find(position) > -1) :  
+                    while (position in used_positions) or (scan_tex_code and position in tex_code) :  
                         # this position has already been specified in earlier vertices (tex_code) or this one
                         # -> shift it above by \tDisjConj
                         if circular :
@@ -188,21 +219,25 @@ def convert_causal_relation(formula: tuple, level_factor_list_order: list, tex_c
                             position = "at ([xshift=\\hDisjConj, yshift={\\vDisjConj + " + str(q) + "*\\tDisjConj}]" + f_fac + ".east)"
                         
                         q = q + 1
+                    used_positions.add(position)
                         
-                    st = st  + "% junction of the conjuncts\n\\node[aux, " + color + "] (" + cross_point + "aux) " + position + " {};\n% partial arrows from the conjuncts to the junction\n"
+                    st_parts.append("% junction of the conjuncts\n\\node[aux, " + color + "] (" + cross_point + "aux) " + position + " {};\n% partial arrows from the conjuncts to the junction\n")
                         
                     
                     for conj in conjunctor_list :
                         # now connect the conjuncts with the junction
-                        if conj[0] == "~" and conj[1:] in get_components_from_formula(disj, level_factor_list_order) :
+                        if conj[0] == "~" and conj[1:] in set_comps_disj :
                             # case B i) the conjunct is a negated factor
-                            color_neg = color_map["draw"][conj[1:]]
-                            st = st  + "\\node[neg, " + color_neg + "] (" + conj[1:] + "neg) at ([xshift=\\LNeg]" + conj[1:] + ".south east) {};\n"
-                            st = st + "\\draw[conjunctonsegment, " + color + "] (" + conj[1:] + "neg) to (" + cross_point + "aux);\n"
+                            if not(conj[1:] in declared_neg):
+                                color_neg = color_map["draw"][conj[1:]]
+                                st_parts.append("\\node[neg, " + color_neg + "] (" + conj[1:] + "neg) at ([xshift=\\LNeg]" + conj[1:] + ".south east) {};\n")
+                                if record_neg:
+                                    declared_neg.add(conj[1:])
+                            st_parts.append("\\draw[conjunctonsegment, " + color + "] (" + conj[1:] + "neg) to (" + cross_point + "aux);\n")
                             
-                        elif conj in get_components_from_formula(disj, level_factor_list_order) :
+                        elif conj in set_comps_disj :
                             # case B ii) the conjunct is a mere factor
-                            st = st + "\\draw[conjunctonsegment, " + color + "] (" + conj + ".east) to (" + cross_point + "aux);\n"
+                            st_parts.append("\\draw[conjunctonsegment, " + color + "] (" + conj + ".east) to (" + cross_point + "aux);\n")
                             
                         else :
                             # Is there anything else that might happen??
@@ -211,27 +246,23 @@ def convert_causal_relation(formula: tuple, level_factor_list_order: list, tex_c
                     # connect the junction with the target factor
                     
                     # experimental label above the connection for very convoluted graphs
-                    st_conj = "$"
-                    for conj in conjunctor_list :
-                        if conj[0] == "~" :
-                            st_conj = st_conj + "\\neg " + conj[1:] + "\\cdot "
-                        else :
-                            st_conj = st_conj + conj + "\\cdot "
-                        
-                    st_conj = st_conj[:-6] + "$"
-                    st = st + "% arrow from junction to target factor\n\\draw[->, " + color + "] (" + cross_point + "aux) -- (" + formula[1] + ".west) node[draw=none,text=black,fill=none,font=\\tiny,pos=0,sloped,above=\\LabelDist] {\\scalebox{.3}{" + st_conj + "}};\n"
+                    st_conj = "$" + "\\cdot ".join([("\\neg " + conj[1:]) if conj[0] == "~" else conj for conj in conjunctor_list]) + "$"
+                    st_parts.append("% arrow from junction to target factor\n\\draw[->, " + color + "] (" + cross_point + "aux) -- (" + formula[1] + ".west) node[draw=none,text=black,fill=none,font=\\tiny,pos=0,sloped,above=\\LabelDist] {\\scalebox{.3}{" + st_conj + "}};\n")
                 
-                elif (disj[0] == "~") and (disj[1:] in get_components_from_formula(formula[0], level_factor_list_order)) :
+                elif (disj[0] == "~") and (disj[1:] in set_comps_formula) :
                     # case C: the disjunction is a negated factor
                     # = the first character is "~" and the further characters correspond to one element from level_factor_list_order
                     
                     # assumption: one disjunctive chain can contain either a mere or its negation (otherwise above "elif" has to been
                     # changed to "if")
                     
-                    st = st + "% negated disjunct\n"
-                    color_neg = color_map["draw"][disj[1:]]
-                    st = st  + "\\node[neg, " + color_neg + "] (" + disj[1:] + "neg) at ([xshift=\\LNeg]" + disj[1:] + ".south east) {};\n"
-                    st = st + "\\draw[->, " + color + "] (" + disj[1:] + "neg) to (" + formula[1] + ".west);\n"
+                    st_parts.append("% negated disjunct\n")
+                    if not(disj[1:] in declared_neg):
+                        color_neg = color_map["draw"][disj[1:]]
+                        st_parts.append("\\node[neg, " + color_neg + "] (" + disj[1:] + "neg) at ([xshift=\\LNeg]" + disj[1:] + ".south east) {};\n")
+                        if record_neg:
+                            declared_neg.add(disj[1:])
+                    st_parts.append("\\draw[->, " + color + "] (" + disj[1:] + "neg) to (" + formula[1] + ".west);\n")
                 
                 
                 else :
@@ -241,7 +272,7 @@ def convert_causal_relation(formula: tuple, level_factor_list_order: list, tex_c
 
             
             
-        elif formula[0].find("*") > -1 :
+        elif "*" in formula[0] :
             
             ################
             # conjunctions #
@@ -251,27 +282,30 @@ def convert_causal_relation(formula: tuple, level_factor_list_order: list, tex_c
             # the only difference is that we here do not deal with a subformula of formula[0], but the whole
             
             # place junction of the conjuncts
-            st = "% junction of the conjuncts\n\\node[aux, " + color + "] (" + formula[1] + "aux) at ([xshift=\\LConj]" + formula[1] + ".west) {};\n% partial arrows from the conjuncts to the junction\n"
+            st_parts = ["% junction of the conjuncts\n\\node[aux, " + color + "] (" + formula[1] + "aux) at ([xshift=\\LConj]" + formula[1] + ".west) {};\n% partial arrows from the conjuncts to the junction\n"]
             
             # plot the arrows from the conjuncts to the junction
-            for conj in get_components_from_formula(formula[0], level_factor_list_order) :
+            for conj in comps_formula :
 
-                if formula[0].find("~" + conj) > -1 :
+                if ("~" + conj) in formula[0] :
                     # case A: the factor conj appears negated n formula
                     
                     # assumption: a conjunction chain can only contain a factor or its negation
                     # (otherwise the subsequent "else" has to be changed into a new "if")
-                    color_neg = color_map["draw"][conj]
-                    st = st  + "\\node[neg, " + color_neg + "] (" + conj + "neg) at ([xshift=\\LNeg]" + conj + ".south east) {};\n"
-                    st = st + "\\draw[conjunctonsegment, " + color + "] (" + conj + "neg) to (" + formula[1] + "aux);\n"
+                    if not(conj in declared_neg):
+                        color_neg = color_map["draw"][conj]
+                        st_parts.append("\\node[neg, " + color_neg + "] (" + conj + "neg) at ([xshift=\\LNeg]" + conj + ".south east) {};\n")
+                        if record_neg:
+                            declared_neg.add(conj)
+                    st_parts.append("\\draw[conjunctonsegment, " + color + "] (" + conj + "neg) to (" + formula[1] + "aux);\n")
                 else :
                     # case B: factor conj occurs non-negated
                     
-                    st = st + "\\draw[conjunctonsegment, " + color + "] (" + conj + ".east) to (" + formula[1] + "aux);\n"
+                    st_parts.append("\\draw[conjunctonsegment, " + color + "] (" + conj + ".east) to (" + formula[1] + "aux);\n")
             
             # draw arrow from junction to target factor
             # experimental with tiny label above vertex
-            st = st + "% arrow from junction to target factor\n\\draw[->, " + color + "] (" + formula[1] + "aux) -- (" + formula[1] + ") node[draw=none, text=black, fill=none, font=\\tiny, above=\\LabelDist, pos=0, sloped] {\\scalebox{.3}{$" + formula[0].replace("*", "\\cdot ").replace("~", "\\neg ") + "$}};\n"
+            st_parts.append("% arrow from junction to target factor\n\\draw[->, " + color + "] (" + formula[1] + "aux) -- (" + formula[1] + ") node[draw=none, text=black, fill=none, font=\\tiny, above=\\LabelDist, pos=0, sloped] {\\scalebox{.3}{$" + formula[0].replace("*", "\\cdot ").replace("~", "\\neg ") + "$}};\n")
             
         else :
             # this should never happen
@@ -282,10 +316,11 @@ def convert_causal_relation(formula: tuple, level_factor_list_order: list, tex_c
             
             print(formula[0] + " -> " + formula[1] + "  could not be drawn because the causal structure has not been recognized.")
             
-    return st
+    return "".join(st_parts)
     
     
-def convert_constitution_relation(formula: tuple, level_factor_list_order: list, constitution_relation_list: list, color: str) -> str:
+def convert_constitution_relation(formula: tuple, level_factor_list_order: list, constitution_relation_list: list, color: str, \
+                                  factor_index: dict | None = None, relations_by_factor: dict | None = None) -> str:
     """Converts a formula of constitution relations into TikZ-Latex code.
     Returns the code as string.
 
@@ -300,6 +335,12 @@ def convert_constitution_relation(formula: tuple, level_factor_list_order: list,
         list of all constitution relations
     color: str
         name of the color in which this section of the hypergraph is drawn
+    factor_index: dict, optional
+        level and causal order of every factor in level_factor_list_order as obtained from
+        get_factor_index, it is determined from level_factor_list_order if it is not given
+    relations_by_factor: dict (str, list of tuples of str), optional
+        the relations of constitution_relation_list grouped by their upper level factor (second element),
+        it is determined from constitution_relation_list if it is not given
 
     Returns
     _______
@@ -307,40 +348,54 @@ def convert_constitution_relation(formula: tuple, level_factor_list_order: list,
         TikZ-Latex code corresponding to formula
     """
     
-    st = ""
+    st_parts = [] # output code, joined at the end
+    if factor_index is None:
+        factor_index = get_factor_index(level_factor_list_order)
+    if relations_by_factor is None:
+        relations_by_factor = {}
+        for f in constitution_relation_list:
+            relations_by_factor.setdefault(f[1], []).append(f)
     
     # constitution relations are drawn differently depending on whether they are to the left or to the right of the upper level factor
     c_left = True
     c_right = True
     
     # check whether it is a left- or rightside relation
-    for f in constitution_relation_list :
-        if (formula[1] == f[1]) and (formula[0] != f[0]) :
+    # the order of a formula is the highest order of its factors
+    comps_formula = get_components_from_formula(formula[0], level_factor_list_order)
+    formula_order = max((factor_index[fac][1] for fac in comps_formula), default=-1)
+    # only the relations to the same upper level factor are visited
+    for f in relations_by_factor.get(formula[1], []) :
+        if formula[0] != f[0] :
+            f_order = max((factor_index[fac][1] for fac in get_components_from_formula(f[0], level_factor_list_order)), default=-1)
             # is there a further constitution relation to the same causal factor which includes factors of higher causal order
             # than those from formula? -> if true it is a leftside relation
             # if there is no further constitution relation it is neighter left- nor rightside
             # if there further relations but of lower order -> rightside relation
-            if get_formula_order(formula[0], level_factor_list_order) < get_formula_order(f[0], level_factor_list_order) :
+            if formula_order < f_order :
                 c_right = False
-            elif get_formula_order(formula[0], level_factor_list_order) > get_formula_order(f[0], level_factor_list_order) :
+            elif formula_order > f_order :
                 c_left = False
+            if not(c_left) and not(c_right) :
+                # neither case can be restored by further relations, so no relation is drawn
+                break
     
     # draw one connecting line toward formula[1] for each causal factor in formula[0]
     # (usually there should only be one factor in formula[0])
-    for fac in get_components_from_formula(formula[0], level_factor_list_order) :           
+    for fac in comps_formula :
         if c_left and not(c_right) :
             # case 1: leftside relation
-            st = st + "\\draw[crelationleft, " + color + "] (" + fac + ".north west) to (" + formula[1] + ".south);\n"
+            st_parts.append("\\draw[crelationleft, " + color + "] (" + fac + ".north west) to (" + formula[1] + ".south);\n")
     
         elif not(c_left) and c_right :
             # case 2: rightside relation
-            st = st + "\\draw[crelationright, " + color + "] (" + fac + ".north east) to (" + formula[1] + ".south);\n"
+            st_parts.append("\\draw[crelationright, " + color + "] (" + fac + ".north east) to (" + formula[1] + ".south);\n")
     
         elif c_left and c_right: 
             # case 3: single component
-            st = st + "\\draw[crelationstraight, " + color + "] (" + fac + ".north) to (" + formula[1] + ".south);\n"
+            st_parts.append("\\draw[crelationstraight, " + color + "] (" + fac + ".north) to (" + formula[1] + ".south);\n")
     
-    return st
+    return "".join(st_parts)
     
 def print_structure_in_tikz_plot(level_factor_list_order: list, level_equiv_list: list, constitution_relation_list: list, color_map: dict) -> str:
     """Prepares the TikZ code for plotting one solution
@@ -371,7 +426,7 @@ def print_structure_in_tikz_plot(level_factor_list_order: list, level_equiv_list
     # step 1: preparing the output files #
     ######################################
     
-    tex_code = "% placement of the nodes\n"
+    tex_parts = ["% placement of the nodes\n"] # the TikZ code in pieces, joined at the end
     
     ###################################################
     # step 2: placement of the nodes = causal factors #
@@ -383,34 +438,40 @@ def print_structure_in_tikz_plot(level_factor_list_order: list, level_equiv_list
     
     placement = ""
 
+    # factors of the complex side of every causal relation, determined once for the placement of the nodes and the relations
+    formula_components = {formula[0]: get_components_from_formula(formula[0], level_factor_list_order) \
+                          for lvl in level_equiv_list for formula in lvl}
+
     for m in range(len(level_factor_list_order)) :
         # add some tex-comments in order to increase the readability of the tex-code
-        tex_code = tex_code  + "% factors of level " + str(m) + ":\n"
+        tex_parts.append("% factors of level " + str(m) + ":\n")
         
         max_num_factors_order = len(level_factor_list_order[m][0])
+        # factors that appear on the complex side of a causal relation of this level
+        source_factors = {fac for formula in level_equiv_list[m] for fac in formula_components[formula[0]]}
         for o in range(len(level_factor_list_order[m])) :
             
             # placement of the factors in their causal order
             # factors of the same order are placed on top of each other
             
-            tex_code = tex_code  + "% causal order " + str(o) + ":\n"
+            tex_parts.append("% causal order " + str(o) + ":\n")
             for e in level_factor_list_order[m][o] :
                 
                 # add a line to tex_code in which the node is placed, its name is the same as the one of the causal factor
                 # and it is displayed on a label
-                tex_code = tex_code + "\\node[draw=" + color_map["draw"][e] + ", text=" + color_map["text"][e] + "] " + placement + " (" + e + ") {$" + e +"$};\n"
+                tex_parts.append("\\node[draw=" + color_map["draw"][e] + ", text=" + color_map["text"][e] + "] " + placement + " (" + e + ") {$" + e +"$};\n")
                 
                 if o == 0 :
                     # highlight incoming factors
-                    tex_code = tex_code + "\\hilightsource{" + e + "};\n"
+                    tex_parts.append("\\hilightsource{" + e + "};\n")
                 
                 
-                if not(any(e in get_components_from_formula(formula[0], level_factor_list_order) for formula in level_equiv_list[m])) :
+                if not(e in source_factors) :
                     # outgoing factors = those that have no outgoing arrows
                     # They do not appear on the complex side of a causal relation.
                     
                     # highlight outgoing factors
-                    tex_code = tex_code + "\\hilighttarget{" + e + "};\n"
+                    tex_parts.append("\\hilighttarget{" + e + "};\n")
                 
                 # prepare the variable placement for the next factor
                 placement = "[above= \\LvDist of " + e + "]"
@@ -432,35 +493,61 @@ def print_structure_in_tikz_plot(level_factor_list_order: list, level_equiv_list
     ######################################################
     # step 3: plot the causal and constitution relations #
     ######################################################
-    tex_code = tex_code  + "\n% causal relations\n"
+    tex_parts.append("\n% causal relations\n")
+    factor_index = get_factor_index(level_factor_list_order) # level and order of every factor, determined once for all relations
+    used_positions = set() # positions of the junction nodes placed so far
+    declared_neg = set() # factors whose negation nodes have been placed so far
     for m in range(len(level_equiv_list)): 
-        tex_code = tex_code  + "% of level "  + str(m) + "\n"
+        tex_parts.append("% of level "  + str(m) + "\n")
         for formula in level_equiv_list[m]:
 
-            tex_code = tex_code  + "% formula: "  + formula[0] + " <-> " + formula[1] + "\n"
+            tex_parts.append("% formula: "  + formula[0] + " <-> " + formula[1] + "\n")
             
             # standard color is black 
             color = "black"
-            if color_map["draw"][formula[1]] == color_map["draw"][get_components_from_formula(formula[0], level_factor_list_order)[0]] :
+            if color_map["draw"][formula[1]] == color_map["draw"][formula_components[formula[0]][0]] :
                 # if the color map entry of target node and the first source node (any other would do it likewise) are identical
                 # use their color for plotting the causal relation
                 color = color_map["draw"][formula[1]]
                 
-            tex_code = tex_code + convert_causal_relation(formula, level_factor_list_order, tex_code, color, color_map) + "\n\n"
+            # the occupied positions of junction nodes are passed by used_positions, so the code produced so far is not needed
+            tex_parts.append(convert_causal_relation(formula, level_factor_list_order, "", color, color_map, used_positions, factor_index, declared_neg) + "\n\n")
     
-    tex_code = tex_code  + "\n% constitution relations\n"
+    tex_parts.append("\n% constitution relations\n")
+    relations_by_factor = {} # constitution relations grouped by their upper level factor, determined once for all relations
+    for formula in constitution_relation_list:
+        relations_by_factor.setdefault(formula[1], []).append(formula)
     for formula in constitution_relation_list:
-        tex_code = tex_code  + "% formula: "  + formula[0] + " <-> " + formula[1] + "\n"
+        tex_parts.append("% formula: "  + formula[0] + " <-> " + formula[1] + "\n")
         
         # standard color is gray
         color = "gray"
         if color_map["text"][formula[1]] != "black" :
             color = color_map["text"][formula[1]]
         
-        tex_code = tex_code + convert_constitution_relation(formula, level_factor_list_order, constitution_relation_list, color) + "\n"
+        tex_parts.append(convert_constitution_relation(formula, level_factor_list_order, constitution_relation_list, color, factor_index, \
+                                                     relations_by_factor) + "\n")
     
-    return tex_code   
+    return "".join(tex_parts)
       
+@lru_cache(maxsize=None)
+def get_latex_template(latex_template_file: str) -> jinja2.Template:
+    """Returns the compiled jinja2 template of latex_template_file.
+    The template is loaded and parsed only once, repeated calls return the cached template.
+
+    Parameters
+    __________
+    latex_template_file: str
+        path to the template file
+
+    Returns
+    _______
+    jinja2.Template
+        compiled template
+    """
+
+    return latex_jinja_env.get_template(latex_template_file)
+
 def create_pdf(tex_code_table: list, latex_template_file: str, total_solutions: int) -> str:
     """Creates a pdf from the list tex_code_table.
     The Latex template assumes that tex_code_table is a list of pairs of a number (used to reference the index of the element) and
@@ -478,7 +565,7 @@ def create_pdf(tex_code_table: list, latex_template_file: str, total_solutions:
     Returns
     _______
     str
-        name of created pdf file
+        name of created pdf file, empty if pdflatex could not be found
     """
     now = datetime.now()
     time_stamp = now.strftime("%Y_%m_%d_%H_%M_%S")
@@ -487,7 +574,7 @@ def create_pdf(tex_code_table: list, latex_template_file: str, total_solutions:
     name = ""
 
     # defining the template (already prepared file)
-    template = latex_jinja_env.get_template(latex_template_file)
+    template = get_latex_template(latex_template_file)
     if total_solutions != len(tex_code_table):
         render = template.render(data = tex_code_table, maxnumber = str(len(tex_code_table)) + " (of " + str(total_solutions) + " in total)")
     else:
@@ -498,18 +585,19 @@ def create_pdf(tex_code_table: list, latex_template_file: str, total_solutions:
     output_path = Path('..').joinpath('..').joinpath('output') # path for exported pdf and tex files
     output_path.mkdir(parents=True, exist_ok=True) # create folder if it does not exist yet
     output_file_path = str(output_path.joinpath(output_file))
-    f = open(output_file_path, 'wb')
-    f.write(render.encode('utf-8'))
-    f.close()
-    
-    
+    with open(output_file_path, "w", encoding="utf-8", newline="") as letter: # line ends are written as rendered, without translation
+        letter.write(render)
+
     # compile this tex file with pdflatex -- requires the Latex compiler to be installed on the executing system
-    with codecs.open(str(output_file_path), "w","utf-8") as letter:
-        letter.write(render);
-        letter.close();
-        os.system("pdflatex -interaction=batchmode " + str(output_file_path))
-        name = str(output_file[:-4]) + '.pdf'
-        print('File ' + name + " created.")
+    # pdflatex is called directly without spawning a shell
+    try:
+        subprocess.run(["pdflatex", "-interaction=batchmode", output_file_path], check=False)
+    except FileNotFoundError:
+        # no pdf has been created, only the tex file remains in the output folder
+        print("pdflatex not found.")
+        return name
+    name = str(output_file[:-4]) + '.pdf'
+    print('File ' + name + " created.")
     
     # remove automatically generated log files
     file_extensions = ['log', 'pdf', 'aux']
@@ -8,13 +8,14 @@ a suspension tree search.
 
 from collections import deque
 import itertools                            # provides function for Cartesian product
-import multiprocessing                      # multiprocessing and functools for multicore usage
 from operator import itemgetter, attrgetter # provide efficient sorting functions
 
-from utils import create_assignments, get_truthvalue, list_to_string, string_to_list, get_ordered_dnf_list, \
+from utils import create_assignments, get_truthvalue, list_to_string, get_ordered_dnf_list, \
                   get_factor_level, flatten_nested_list, contains_term, get_components_from_formula, find_effects, \
                   get_coextensive_factors
 
+MAX_CACHE_LENGTH = 1000000 # maximal number of memoised accuracies, beyond it accuracies are recomputed
+
 class Node(object):
     """Node of a tree-structure
 
@@ -102,14 +103,19 @@ class Node(object):
         list of Node
             list of all descendant nodes
         """
+        # the nodes are visited by an explicit stack instead of recursive calls, every visited node
+        # contributes its children, the order is the same as that of the recursive traversal
         list_of_nodes = []
-        list_of_nodes.extend(self.children)
-        for child in self.children:
-            list_of_nodes.extend(child.get_all_nodes())
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            list_of_nodes.extend(node.children)
+            stack.extend(reversed(node.children))
         return list_of_nodes
 
-    def create_new_nodes(self, active_nodes: list, data_table: dict, target_factor: str, created_nodes: list, \
-                         suspended: bool = False, target_factor_level: int = 0, max_disj: int = 0, max_conj: int = 0) -> list:
+    def create_new_nodes(self, active_nodes: list, data_table: list, target_factor: str, created_nodes: list, \
+                         suspended: bool = False, target_factor_level: int = 0, max_disj: int = 0, max_conj: int = 0, \
+                         created_values: set | None = None, formula_accuracy: dict | None = None) -> list:
         """Creates new nodes as children of the current node.
 
         Constructs all DNF that can be formed of the current node combined with any of the nodes from
@@ -144,6 +150,13 @@ class Node(object):
         max_conj: int, optional
             maximum number of conjunctions per disjunct in each DNF-formula
             if max_conj=0, there is no upper limit
+        created_values: set of tuples of tuples of str, optional
+            values of all nodes in created_nodes as nested tuples, it is updated by the values of the
+            newly created nodes; if it is not given, it is determined from created_nodes
+        formula_accuracy: dict (tuple of tuples of str, float), optional
+            accuracy of already evaluated formulae keyed by their values as nested tuples, it is updated
+            by the newly evaluated formulae until it holds MAX_CACHE_LENGTH entries; if it is not given,
+            only the formulae of this call are memoised
 
         Returns
         _______
@@ -174,8 +187,8 @@ class Node(object):
             # sort elements by accuracy for target_factor in descending order to start with the most promising literals
             list_to_add.sort(key=itemgetter(1), reverse=True)
             for value, acc, level in list_to_add:
-                new_node = Node(value, name=str(value)[3:-3], level=level, accuracy=acc, recall=get_recall(value, data_table, target_factor),\
-                                specificity=get_specificity(value, data_table, target_factor))
+                recall, specificity = get_recall_and_specificity(value, data_table, target_factor)
+                new_node = Node(value, name=str(value)[3:-3], level=level, accuracy=acc, recall=recall, specificity=specificity)
                 if suspended:
                     new_node.suspended = True
                 out_list.append(new_node)
@@ -183,7 +196,7 @@ class Node(object):
             return out_list
         else:
             # higher level, connecting nodes by conjunctors or disjunctors
-            new_nodes = [] # store triples of (new_node, accuracy, second_parent) (first parent is the current node)
+            candidates = [] # store pairs of (new_value, second_parent) (first parent is the current node)
             for anc_node in active_nodes:
                 if self.level == anc_node.level:
                     # only complex terms of factors from the same level are meaningful
@@ -197,20 +210,11 @@ class Node(object):
                                 if max_conj == 0 or len(disj) + len(anc_node.value[0]) < max_conj + 1:
                                     # maximal conjunction length not surpassed
 
-                                    # replace old disj-term by new disj + "*" + anc_node[0] and reorder disjuncts and conjuncts alphabetically
-                                    self_value_string = list_to_string(self.value)
-                                    disj_string = list_to_string(disj)
-                                    new_string = list_to_string([[*disj, *anc_node.value[0]]])
-                                    if self_value_string.find(disj_string) == 0:
-                                        # disj is first disjunct
-                                        new_value = get_ordered_dnf_list(string_to_list(new_string + self_value_string[len(disj_string):]))
-                                    elif len(self_value_string.replace(disj_string, "")) == self_value_string.find(disj_string):
-                                        # disj is last term
-                                        new_value = get_ordered_dnf_list(string_to_list(self_value_string[:-len(disj_string)] + new_string))
-                                    else:
-                                        # disj is middle term
-                                        new_value = get_ordered_dnf_list(string_to_list(self_value_string.replace("+ " + disj_string + " +", "+ " + new_string + " +")))
-                                    new_nodes.append((new_value, get_accuracy(new_value, data_table, target_factor), anc_node))
+                                    # replace old disj-term by new disj + "*" + anc_node[0] and reorder disjuncts and conjuncts alphabetically,
+                                    # the nested list is modified directly instead of its string (disjuncts of a minimal DNF are unique)
+                                    new_value = get_ordered_dnf_list([[*disj, *anc_node.value[0]] if disj2 == disj else list(disj2) \
+                                                                      for disj2 in self.value])
+                                    candidates.append((new_value, anc_node))
 
 
                     # next step add further disjunctive terms:
@@ -221,17 +225,46 @@ class Node(object):
                             # avoid appending disjuncts that are already part of current node
                             # (if one factor appears in several disjuncts, introduce first the other conjuncts)
                             new_value = get_ordered_dnf_list([*self.value, *anc_node.value])
-                            new_nodes.append((new_value, get_accuracy(new_value, data_table, target_factor), anc_node))
+                            candidates.append((new_value, anc_node))
+
+            # the values are ordered DNFs, so equal formulae have equal nested tuples and
+            # previously created formulae are found by hashing instead of comparing against every node
+            if created_values is None:
+                created_values = {tuple(map(tuple, node.value)) for node in created_nodes}
+
+            # evaluate the accuracy of every formula only once, candidates for which a node has already been
+            # created are skipped here since they would not be created again anyway
+            new_nodes = [] # store tuples of (new_value, accuracy, second_parent, value_key, value_string)
+            if formula_accuracy is None:
+                formula_accuracy = {} # accuracy of the already evaluated formulae
+            for new_value, anc_node in candidates:
+                # the nested tuple of the ordered DNF is computed once per candidate and reused as its key
+                value_key = tuple(map(tuple, new_value))
+                if not(value_key in created_values):
+                    if value_key in formula_accuracy:
+                        accuracy = formula_accuracy[value_key]
+                    else:
+                        accuracy = get_accuracy(new_value, data_table, target_factor)
+                        # the memo stops growing at MAX_CACHE_LENGTH so that deep searches do not exhaust the memory
+                        if len(formula_accuracy) < MAX_CACHE_LENGTH:
+                            formula_accuracy[value_key] = accuracy
+                    # the string of the formula is built once for the sorting and as name of the new node
+                    new_nodes.append((new_value, accuracy, anc_node, value_key, list_to_string(new_value)))
 
             # sort new_nodes by descending accuracy to continue with the most promising elements first
-            new_nodes.sort(key = lambda y: (y[1], -len(list_to_string(y[0]))), reverse=True) # second key guarantees that for same accuracy,
+            new_nodes.sort(key = lambda y: (y[1], -len(y[4])), reverse=True) # second key guarantees that for same accuracy,
             # shorter expressions come first
 
+            # the minimality checks below only compare with nodes that are equivalent to target_factor,
+            # they are collected once and extended by the new equivalent nodes instead of filtering all created nodes for every check
+            equivalent_nodes = [node for node in created_nodes if node.accuracy == 1.]
+
             # add new nodes to out_list
-            for value, acc, sec_parent in new_nodes:
-                if not(any(node.value == value for node in created_nodes)):
-                    new_node = Node(value, name=list_to_string(value), level=self.level, accuracy=acc,\
-                                    recall=get_recall(value, data_table, target_factor), specificity=get_specificity(value, data_table, target_factor))
+            for value, acc, sec_parent, value_key, value_string in new_nodes:
+                if not(value_key in created_values):
+                    # recall and specificity are determined together in one pass over the data table
+                    recall, specificity = get_recall_and_specificity(value, data_table, target_factor)
+                    new_node = Node(value, name=value_string, level=self.level, accuracy=acc, recall=recall, specificity=specificity)
                     to_be_created = True
                     if suspended:
                         new_node.suspended = True
@@ -242,18 +275,18 @@ class Node(object):
                         new_node.suspended = True
                     elif len(new_node.value) > 1 and any(any(len(node.value) == len(new_node.value) and node.accuracy == 1.0 \
                          and all(contains_term(list_to_string(disj2), list_to_string(disj1)) or any(disj2 == disj for disj in new_node.value) \
-                         for disj2 in node.value) for node in created_nodes) for disj1 in new_node.value):
+                         for disj2 in node.value) for node in equivalent_nodes) for disj1 in new_node.value):
                         # remove disjunctions for which all disjuncts are either equal to or contain all disjuncts of an already found equivalent
                         to_be_created = False
-                    elif any(node.accuracy == 1. and len(new_node.value) > len(node.value) and all(disj in new_node.value for disj in node.value) for node in created_nodes):
+                    elif any(node.accuracy == 1. and len(new_node.value) > len(node.value) and all(disj in new_node.value for disj in node.value) for node in equivalent_nodes):
                         # enforce minimal necessity cf. Baumgartner (2009) "Uncovering Deterministic Causal Structures: A Boolean Approach" p. 4
                         to_be_created = False
                     elif any(node.accuracy == 1. and len(new_node.value) > 1 and len(node.value) == 1 and any(new_node.value == \
-                             get_ordered_dnf_list([[*node.value[0], conj], [*node.value[0], "~" + conj]]) for disj in new_node.value for conj in disj) for node in created_nodes):
+                             get_ordered_dnf_list([[*node.value[0], conj], [*node.value[0], "~" + conj]]) for disj in new_node.value for conj in disj) for node in equivalent_nodes):
                         # new node has the form X*A + X*~A with X.accuracy=1
                         new_node.suspended = True
-                    elif any(any(len(node2.value) == 1 and node2.accuracy == 1. and contains_term(list_to_string(node2.value), list_to_string(disj)) \
-                         for node2 in created_nodes) for disj in value):
+                    elif any(any(len(node2.value) == 1 and node2.accuracy == 1. and contains_term(node2.name, list_to_string(disj)) \
+                         for node2 in equivalent_nodes) for disj in value):
                         # enforce minimal sufficiency cf. Baumgartner (2009) "Uncovering Deterministic Causal Structures: A Boolean Approach" p. 4
                         to_be_created = False
 
@@ -261,6 +294,9 @@ class Node(object):
                         out_list.append(new_node)
                         self.add_child(new_node)
                         created_nodes.append(new_node)
+                        created_values.add(value_key)
+                        if new_node.accuracy == 1.:
+                            equivalent_nodes.append(new_node)
 
             return out_list
 
@@ -293,8 +329,9 @@ def get_accuracy(formula: list, data_table: list, target_factor: str) -> float:
     else:
         count_correct = 0
         count_wrong = 0
+        formula_string = list_to_string(formula) # converted once instead of for every row
         for assignment in data_table:
-            if get_truthvalue((list_to_string(formula), target_factor), assignment):
+            if get_truthvalue((formula_string, target_factor), assignment):
                 count_correct += 1
             else:
                 count_wrong += 1
@@ -330,11 +367,12 @@ def get_recall(formula, data_table, target_factor):
     else:
         P = 0
         TP = 0
+        formula_string = list_to_string(formula) # converted once instead of for every row
 
         for assignment in data_table:
             if get_truthvalue(target_factor, assignment):
                 P += 1
-                if get_truthvalue(list_to_string(formula), assignment):
+                if get_truthvalue(formula_string, assignment):
                     TP += 1
         if P == 0:
             # avoid division by zero
@@ -372,11 +410,12 @@ def get_specificity(formula, data_table, target_factor):
     else:
         N = 0
         TN = 0
+        formula_string = list_to_string(formula) # converted once instead of for every row
 
         for assignment in data_table:
             if not(get_truthvalue(target_factor, assignment)):
                 N += 1
-                if not(get_truthvalue(list_to_string(formula), assignment)):
+                if not(get_truthvalue(formula_string, assignment)):
                     TN += 1
         if N == 0:
             # avoid division by zero
@@ -384,6 +423,59 @@ def get_specificity(formula, data_table, target_factor):
             N = 1
         return (TN/N)
 
+def get_recall_and_specificity(formula: list, data_table: list, target_factor: str) -> tuple:
+    """Returns the recall and the specificity of how well formula functions as equivalent to target_factor,
+    both are determined in a single pass over data_table with the same results as get_recall and
+    get_specificity.
+
+    Parameters
+    __________
+    formula: list of lists of str
+        nested list representing a DNF-formula
+    data_table: list of dict (str, bool)
+        truth table in form of a list of dictionaries, each row corresponds to
+        one list element, each element is dictionary with the same keys (the factors)
+        and Boolean values
+    target_factor: str
+        name of the factor whose values determine the true values (TP and TN)
+
+    Returns
+    _______
+    float
+        ratio TP / P, or 0 if formula is not a list or empty,
+        or 1 if P=0
+    float
+        ratio TN / N, or 0 if formula is not a list or empty,
+        or 1 if N=0
+    """
+    if not(isinstance(formula, list)) or formula == []:
+        return 0, 0
+    else:
+        P = 0
+        TP = 0
+        N = 0
+        TN = 0
+        formula_string = list_to_string(formula) # converted once instead of for every row
+
+        # every row is either positive or negative, so the target factor and the formula are evaluated once per row
+        for assignment in data_table:
+            if get_truthvalue(target_factor, assignment):
+                P += 1
+                if get_truthvalue(formula_string, assignment):
+                    TP += 1
+            else:
+                N += 1
+                if not(get_truthvalue(formula_string, assignment)):
+                    TN += 1
+        # avoid division by zero as in get_recall and get_specificity
+        if P == 0:
+            TP = 1
+            P = 1
+        if N == 0:
+            TN = 1
+            N = 1
+        return (TP/P), (TN/N)
+
 def replace_instances_all_combs(original_string: str, target: str, replacement: str) -> list:
     """Returns the list of strings which can be generated by parially replacing instances of the target
     string in original_string by replacement. For n instances of target, the resulting list will
@@ -404,22 +496,20 @@ def replace_instances_all_combs(original_string: str, target: str, replacement:
         list of all combinations of replacements or not for every instance of target in original_string
     """
 
-    # create a list of combinations where each instance of the target string is replaced with its replacement or kept as it is
-    combinations = []
-    index = 0
+    # the parts of original_string between the instances of target are kept as whole slices
+    # instead of being combined character by character
+    parts = original_string.split(target)
 
-    while index < len(original_string):
-        if original_string.startswith(target, index):
-            # if target string is found, add its replacement and itself to options
-            combinations.append([replacement, target])
-            index += len(target)  # Move past the length of the target string
-        else:
-            # otherwise, add the current character as an option
-            combinations.append([original_string[index]])
-            index += 1
+    # the parts are interleaved with slots for the instances of target, only the slots are overwritten
+    # for every combination and the whole list is joined once, without concatenating each option and part
+    pieces = [""] * (2 * len(parts) - 1)
+    pieces[::2] = parts
 
-    # Generate all combinations of these options
-    result = [''.join(combination) for combination in itertools.product(*combinations)]
+    # each instance of the target string is either replaced with its replacement or kept as it is
+    result = []
+    for combination in itertools.product([replacement, target], repeat=len(parts) - 1):
+        pieces[1::2] = combination
+        result.append("".join(pieces))
 
     return result
 
@@ -500,6 +590,8 @@ def suspension_bfs(root: Node, target: str, causes_list: list, data_table: list,
         return False, [], 0
 
     created_nodes = [root]
+    created_values = {tuple(map(tuple, root.value))} # values of created_nodes as nested tuples
+    formula_accuracy = {} # accuracy of all formulae evaluated during the search, target and data_table are fixed
     active_nodes = root.get_all_nodes()
     suspended_nodes = []
     ancestors = []
@@ -549,15 +641,19 @@ def suspension_bfs(root: Node, target: str, causes_list: list, data_table: list,
         # populating the tree
         if current_node == root and active_nodes == []:
             # in the first run, active_nodes is replaced by the list of factors -> the first children will be the set of literals
-            current_node.create_new_nodes(causes_list, data_table, target, created_nodes, suspended=False, target_factor_level=target_factor_level, max_disj=max_disj, max_conj=max_conj)
-            for child in current_node.children:
-                created_nodes.append(child)
-                if active:
+            current_node.create_new_nodes(causes_list, data_table, target, created_nodes, suspended=False, target_factor_level=target_factor_level, max_disj=max_disj, max_conj=max_conj, \
+                                          created_values=created_values, formula_accuracy=formula_accuracy)
+            # the children of the root are registered in bulk
+            created_nodes.extend(current_node.children)
+            created_values.update(tuple(map(tuple, child.value)) for child in current_node.children)
+            if active:
+                for child in current_node.children:
                     if not(child.name in active or child.name[1:] in active):
                         child.suspended = True
 
         elif current_node != root:
-            current_node.create_new_nodes(active_nodes, data_table, target, created_nodes, suspended=False, target_factor_level=target_factor_level, max_disj=max_disj, max_conj=max_conj)
+            current_node.create_new_nodes(active_nodes, data_table, target, created_nodes, suspended=False, target_factor_level=target_factor_level, max_disj=max_disj, max_conj=max_conj, \
+                                          created_values=created_values, formula_accuracy=formula_accuracy)
 
 
         for child in current_node.children:
@@ -584,12 +680,10 @@ def suspension_bfs(root: Node, target: str, causes_list: list, data_table: list,
     elif suspended_nodes and counter < max_depth:
         # After finishing BFS check if no solution was found, reevaluate suspensions.
         # loop through all nodes and reactivate them if suspended
-        def reactivate_suspended(node):
+        root.suspended = False
+        for node in root.get_all_nodes():
             node.suspended = False
-            for child in node.children:
-                reactivate_suspended(child)
 
-        reactivate_suspended(root)
         return suspension_bfs(root, target, causes_list, data_table, target_factor_level=target_factor_level, max_depth=max_depth, counter=counter, max_disj=max_disj, max_conj=max_conj, suspension_acc=suspension_acc/2., threshold=threshold)
     else:
         return False, good_enough_list, last_element_added
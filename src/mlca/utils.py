@@ -7,6 +7,25 @@
 
 import re                          # regex for complex search patterns in strings
 import itertools                   # itertools provides functions to obtain all permutations of a string and Cartesian products of lists
+from functools import lru_cache    # caching of results of frequently repeated function calls
+
+# disjunctor " + " with arbitrary white space around "+"
+DISJUNCTOR_PATTERN = re.compile(r'\s*\+\s*')
+# disjunctor " + " with exactly one white space on either side of "+"
+SPACED_DISJUNCTOR_PATTERN = re.compile(r'\s\+\s')
+# separators ", " and " < " between causal factors in the input files
+FACTOR_SEPARATOR_PATTERN = re.compile(r',\s*|\s*<\s*')
+# end-of-line symbols
+NEWLINE_PATTERN = re.compile(r'\r?\n')
+# at least two consecutive white spaces
+MULTI_SPACE_PATTERN = re.compile(r'\s{2,}')
+# single space or tab
+SPACE_OR_TAB_PATTERN = re.compile(r'[ \t]')
+# negated factors (minuscles) in cna output at the beginning of a formula, after a conjunctor, after a disjunctor
+# or after a negator, the first group is the preceding operator, the second the minuscles
+CNA_NEGATION_PATTERN = re.compile(r'(^|\*|\s\+\s|~)([a-z]+)')
+# maximal number of terms whose conjunct sets are cached by get_conjunct_set
+CONJUNCT_CACHE_SIZE = 65536
 
 def powerset(in_set: set) -> set:
     """Returns the powerset of the input in_set.
@@ -74,14 +93,57 @@ def contains_term(original_term: str, comparison_term: str) -> bool:
     if original_term == "":
         return False
     else:
-        aux_list = string_to_list(original_term)
-        all_found = True
-        for fac in aux_list[0]:
-            if not(fac in string_to_list(comparison_term)[0]):
-                all_found = False
-                break
+        return get_conjunct_set(original_term) <= get_conjunct_set(comparison_term)
 
-        return all_found
+@lru_cache(maxsize=CONJUNCT_CACHE_SIZE)
+def get_conjunct_set(term: str) -> frozenset:
+    """Returns the conjuncts of the first disjunct of term as a frozenset.
+
+    The results of the CONJUNCT_CACHE_SIZE most recently used terms are cached, such that
+    a term is not parsed again every time it is compared by contains_term.
+
+    Parameters
+    __________
+    term: str
+        string, expected to express a conjunctive formula with conjunctor '*'
+
+    Returns
+    _______
+    frozenset of str
+        conjuncts of the first disjunct of term
+    """
+
+    return frozenset(string_to_list(term)[0])
+
+def get_term_mask(term: str, literal_bits: dict) -> int:
+    """Encodes a conjunctive term as an integer bitmask in which every literal of term
+    sets one bit. The bits are looked up in literal_bits, literals that are not yet
+    listed there are assigned to the next free bit.
+
+    For two terms a and b encoded with the same literal_bits, a is contained in b
+    (in the sense of contains_term) iff mask_a & mask_b == mask_a.
+
+    Parameters
+    __________
+    term: str
+        string expected to express a conjunction with conjunctor '*'
+    literal_bits: dict
+        dictionary that assigns a distinct power of two to each literal,
+        it is extended by the literals of term that are not yet contained
+
+    Returns
+    _______
+    int
+        bitmask of term, 0 if term is the empty string
+    """
+
+    mask = 0
+    if term != "":
+        for lit in term.split("*"):
+            if not(lit in literal_bits):
+                literal_bits[lit] = 1 << len(literal_bits)
+            mask = mask | literal_bits[lit]
+    return mask
 
 def flatten_nested_list(in_list: list) -> list:
     """Flattens an homogenous list up to two times in case that it is a nested list.
@@ -131,10 +193,10 @@ def find_causal_factors(st: str) -> list:
     """
     
     # deletes end-of-line-symbol ("\n") and spaces at the end of line if necessary
-    st = re.sub("\r?\n","",st).rstrip()
+    st = NEWLINE_PATTERN.sub("",st).rstrip()
     
     # returns the list of components of st that were separated by ", " or " < "
-    return re.split(r',\s*|\s*<\s*', st)
+    return FACTOR_SEPARATOR_PATTERN.split(st)
     
 
 def get_causal_prefactors(factor: str, formula_list: list, factor_list: list) -> list :
@@ -205,46 +267,47 @@ def find_effects(formula: list, factor_list: list) -> list:
         list of elements from factor_list that do not satisfy any of the conditions 1)-3)
     """
 
+    # the terms are encoded as bitmasks of their literals, the conditions 1)-3) are then
+    # checked with bitwise operations instead of searching the lists of literals
+    literal_bits = {}
+    # repeated terms do not change any of the conditions, hence every term is taken only once
+    set_masks = {get_term_mask("*".join(term), literal_bits) for term in formula}
+    term_masks = list(set_masks)
+
     # start with the full list of causal factors and reduce it accordingly to 1)-3) until only effects remain
     effect_list = [x for x in factor_list]
     for i in range(len(effect_list)-1,-1,-1):
-        cond = True
+        pos_bit = get_term_mask(effect_list[i], literal_bits)
+        neg_bit = get_term_mask("~" + effect_list[i], literal_bits)
+        both_bits = pos_bit | neg_bit
+
         # first test: appears effect_list[i] in every formula (and its negation nowhere)?
-        for term in formula:
-            if not(effect_list[i] in term):
-                cond = False
-                break
+        # second test: appears the negation of effect_list[i] in every formula?
+        cond = all(mask & pos_bit for mask in term_masks) or all(mask & neg_bit for mask in term_masks)
 
         if not(cond):
-            cond = True
-            # second test: appears the negation of effect_list[i] in every formula?
-            st = "~" + effect_list[i]
-            for term in formula:
-                if not(st in term):
-                    cond = False
+            # third test: are there two terms such that every literal of the first one, except for
+            # effect_list[i] or its negation, is contained in the second one, which contains
+            # effect_list[i] or its negation, too?
+            for mask in term_masks:
+                rest_mask = mask & ~both_bits
+                # most often the second term is the first one with effect_list[i] flipped or added,
+                # this can be looked up directly before all terms are compared
+                if mask & pos_bit:
+                    cond = (rest_mask | neg_bit) in set_masks
+                elif mask & neg_bit:
+                    cond = (rest_mask | pos_bit) in set_masks
+                else:
+                    cond = (mask | pos_bit) in set_masks or (mask | neg_bit) in set_masks
+                if cond:
                     break
-
-            if not(cond):
-                for term in formula:
-                    for sec_term in formula:
-                        if sec_term == term:
-                            sec_cond = False
-                        else:
-                            sec_cond = True
-                            for fac in term:
-                                # check whether all conditions are not satisfied for fac from term:
-                                # (i) fac is effect_list[i] and sec_term its negation
-                                # (ii) sec_term contains effect_list[i] and fac is its negation
-                                # (iii) fac is contained in sec_term
-                                if not((fac == effect_list[i] and st in sec_term) or (fac == st and effect_list[i] in sec_term) or fac in sec_term):
-                                    sec_cond = False
-                                    break
-
-                        if sec_cond:
-                            break
-                    if sec_cond:
+                for sec_mask in term_masks:
+                    if sec_mask != mask and rest_mask & sec_mask == rest_mask and \
+                       (not(mask & both_bits) or sec_mask & both_bits):
                         cond = True
                         break
+                if cond:
+                    break
         if cond:
             # delete the causal factor if either of the three exclusion criteria is true
             #print(effect_list[i] + " discarded. It has no causal relevance for any other causal factor.")
@@ -292,12 +355,10 @@ def string_to_list(st: str) -> list:
     list of lists of str
         nested list of form out_list[DISJUNCT][CONJUNCT]
     """
-    out_list = []
-    disj_list = re.split(r'\s*\+\s*', st)
-    for disj in disj_list:
-        out_list.extend([re.split(r'\*', disj)])
-
-    return out_list
+    if not("+" in st):
+        # conjunction or single literal, the disjunctor pattern would not split it anyway
+        return [st.split("*")]
+    return [disj.split("*") for disj in DISJUNCTOR_PATTERN.split(st)]
     
 def get_equiv_formula(st: str) -> tuple:
     """Transforms a string into a tuple of strings (a,b) with the following characteristics:
@@ -320,39 +381,52 @@ def get_equiv_formula(st: str) -> tuple:
     tuple of str
     """
 
-    a = re.split(" <-> ",st)[0].strip()          # strip() removes leading spaces
+    equiv_parts = st.split(" <-> ", 2) # only the first two parts are used
+    a = equiv_parts[0].strip()          # strip() removes leading spaces
     # in case that the line starts with some unnecessary stuff, followed by spaces, capture only content
     # behind white space
-    if bool(re.search(r'\s{2,}', a)):
-        a = re.split(r'\s{2,}', a)[1]        
-    b = re.split(" <-> ",st)[1].strip()
+    # (split once, it yields more than one part iff the pattern occurs)
+    a_parts = MULTI_SPACE_PATTERN.split(a, 2)
+    if len(a_parts) > 1:
+        a = a_parts[1]
+    b = equiv_parts[1].strip()
     
     # conversion of the negation syntax (in cna by minuscle) such that "a" -> "~A"
-    # 1. step: add "~" before each minuscle, which is either
-    # a) at the beginning of a formula
-    # b) follows a conjunctor
-    # c) follows a disjunctor
-    a = re.sub(r'^([a-z])',  r'~\1', a)
-    # explanation:  "sub" replaces each instance of a minuscle (expressed by "[a-z]")
-    # by itself plus the prefix "~",
-    # if it has been found at the first position of the string (implicated by "^")
-
-    # b) if following a "*", the letter will be placed behind "*~"
-    a = re.sub(r'\*([a-z])',  r'*~\1', a)
-    # The regex expression "\*" picks the star symbol "*" from the string.
-
-    # c) if following " + ", the letter will be placed behind "+ ~"
-    a = re.sub(r'\s\+\s([a-z]+)',  r' + ~\1', a)
-    # in regex "\s" corresponds to spaces, "\+" to "+"
-
-    # 2. step replacement of the minuscle that follow to "~" by majuscle
-    a = re.sub(r'(~[a-z]+)', lambda pat: pat.group(1).upper(), a)
-    
-    
+    # every minuscle is matched together with the operator in front of it, which is either
+    # a) the beginning of a formula
+    # b) a conjunctor "*"
+    # c) a disjunctor " + " (in regex "\s" corresponds to spaces, "\+" to "+")
+    # d) a negator "~" that is already there
+    # in one pass over a, the minuscles are replaced by majuscles and prefixed with "~"
+    a = CNA_NEGATION_PATTERN.sub(get_cna_negation, a)
+
     # The lines of the cna output contain further stuff, we can get rid off it:
-    b = re.split(r'[ \t]',b)[0]
+    b = SPACE_OR_TAB_PATTERN.split(b, 1)[0]
     return (a,b)
 
+def get_cna_negation(pat: re.Match) -> str:
+    """Returns the replacement of a match of CNA_NEGATION_PATTERN: the minuscles of a
+    negated factor in cna syntax are converted to the negator '~' followed by majuscles,
+    the preceding conjunctor or disjunctor is kept.
+
+    Parameters
+    __________
+    pat: re.Match
+        match of CNA_NEGATION_PATTERN
+
+    Returns
+    _______
+    str
+        operator in front of the factor followed by the negated factor in majuscles
+    """
+
+    if pat.group(1) == "~" or pat.group(1) == "":
+        return "~" + pat.group(2).upper()
+    elif pat.group(1) == "*":
+        return "*~" + pat.group(2).upper()
+    else:
+        return " + ~" + pat.group(2).upper()
+
 def get_components_from_formula(st: str, factor_list: list) -> list:
     """Returns a list of the elements of factor_list that appear in the input string st.
     The returned list is empty if no factor from factor_list appears in st or factor_list is empty,
@@ -371,37 +445,10 @@ def get_components_from_formula(st: str, factor_list: list) -> list:
         elements of factor_list that have been found in st or empty list
     """
     
-    component_list = []                          # declaration of the list
-    
-    # since we use several nested lists of causal factors, we have to treat all cases separately
-    # - the factors are elements of the list as in factor_list from main -> first case
-    # - the factors are elements of the elements of the list as in level_factor_list from main -> second case
-    # - the factors are elements of elements of the elements of the list as in level_factor_list_order from main -> third case
-
-    if isinstance(factor_list[0], str) :
-        # first case: check the elements from factor_list
-        for element in factor_list:
-            if st.find(element) > -1:
-                component_list.append(element)
-    
-    elif isinstance(factor_list[0], list) :
-        if isinstance(factor_list[0][0], str) :
-            # second case: traverse the sublists of factor_list and check for occurrences in st 
-            for m in range(len(factor_list)) :
-                for element in factor_list[m] :
-                    if st.find(element) > -1 :
-                        component_list.append(element)
-                        
-        elif isinstance(factor_list[0][0], list):
-            if isinstance(factor_list[0][0][0], str) :
-                # third case: traverse the subsublists of factor_list and check for occurrences in st
-                for m in range(len(factor_list)) :
-                    for o in range(len(factor_list[m])) :
-                        for element in factor_list[m][o] :
-                            if st.find(element) > -1 :
-                                component_list.append(element) 
-    
-    return component_list
+    # the factors may be elements of factor_list as in factor_list from main, or elements of its elements as in
+    # level_factor_list from main, or elements of the elements of its elements as in level_factor_list_order from main,
+    # all three cases are traversed as one flattened list
+    return [element for element in flatten_nested_list(factor_list) if element in st]
 
 def get_factor_level(factor: str, level_factor_list: list) -> int:
     """Returns the index of the sublist of the nested list level_factor_list which contains factor.
@@ -556,6 +603,32 @@ def get_factor_order(factor: str, factor_list: list) -> int:
         
     return order
     
+def get_factor_index(factor_list: list) -> dict:
+    """Maps every factor in the nested list factor_list to the indices of the level and the
+    causal order in which it appears first, such that get_factor_level and get_factor_order
+    reduce to dictionary lookups for repeated queries on the same list.
+
+    Parameters
+    __________
+    factor_list : list of lists of lists of str
+        nested list of factors, form [LEVEL][CAUSAL_ORDER][FACTOR]
+
+    Returns
+    _______
+    dict
+        keys are the factors, values are pairs (level, order) of indices of the sublists
+        that contain the factor
+    """
+
+    factor_index = {}
+    for m, level in enumerate(factor_list):
+        for o, order in enumerate(level):
+            for fac in order:
+                if not(fac in factor_index):
+                    factor_index[fac] = (m, o)
+
+    return factor_index
+
 def get_formula_order(formula: str, factor_list: list) -> int:
     """Applies get_components_from_formula on formula and searches for all obtained
     substrings in sublists of factor_list. If all substrings have been found, returns
@@ -616,27 +689,14 @@ def get_ordered_dnf_string(formula: str) -> str:
         formula = ""
                                          
     # split formula into disjuncts
-    disj_list = re.split(r'\s\+\s', formula)
+    disj_list = SPACED_DISJUNCTOR_PATTERN.split(formula)
                                         
-    # split disjuncts into conjuncts
-    conj_list = [re.split(r'\*', disj) for disj in disj_list] # nested list conj_list[DISJUNCT][CONJUNCT IN DISJUNCT]
-    for disj in conj_list:
-        # sort each conjunct
-        disj.sort()
-    # sort each disjunct
-    conj_list.sort()                                        
+    # split disjuncts into conjuncts and sort the conjuncts of each disjunct
+    conj_list = [sorted(disj.split("*")) for disj in disj_list] # nested list conj_list[DISJUNCT][CONJUNCT IN DISJUNCT]
+    # sort the disjuncts
+    conj_list.sort()
     # reconstruct the formula
-    new_formula = ""
-    for disj in conj_list:
-        for conj in disj:
-            new_formula = new_formula + conj + "*"
-        # remove trailing "*"
-        new_formula = new_formula[:-1]
-        new_formula = new_formula + " + "
-                                        
-    # remove trailing " + "
-    new_formula = new_formula[:-3]
-    return new_formula
+    return " + ".join(["*".join(disj) for disj in conj_list])
 
 
 def get_ordered_dnf_list(formula: list) -> list:
@@ -896,15 +956,15 @@ def get_truthvalue(formula: list, assignment: dict) -> bool:
 
         elif type(formula) == str and len(formula) > 1:
             # case (2b) - complex string
-            if formula.find(' + ') > -1:
+            # the formula is split into all its disjuncts (conjuncts) at once, instead of splitting off
+            # one of them per recursion and scanning the rest of the formula again
+            if ' + ' in formula:
                 # split disjunction
-                terms = formula.split(' + ', 1)
-                truthvalue = get_truthvalue(terms[0], assignment) or get_truthvalue(terms[1], assignment)
-            elif formula.find('*') > -1:
+                truthvalue = any(get_truthvalue(disj, assignment) for disj in formula.split(' + '))
+            elif '*' in formula:
                 # split conjunction
-                terms = formula.split('*', 1)
-                truthvalue = get_truthvalue(terms[0], assignment) and get_truthvalue(terms[1], assignment)
-            elif formula.find('~') == 0:
+                truthvalue = all(get_truthvalue(conj, assignment) for conj in formula.split('*'))
+            elif formula[0] == '~':
                 # negator (as main operator) can only be in the first position
                 truthvalue = not(get_truthvalue(formula[1:], assignment))
             else:
@@ -974,10 +1034,7 @@ def count_true(function_list: list, factor_list: list) -> int:
     counter = 0 # counts in how many cases function_list is True
     
     # determine variables occuring in formula
-    st = ''
-    for term in function_list:
-        st = st + '(' + term[0] + '<->' + term[1] + ')*'
-    st = st[:-1]
+    st = "*".join(['(' + term[0] + '<->' + term[1] + ')' for term in function_list])
     
     variable_list = get_components_from_formula(st, factor_list)
     
@@ -1045,38 +1102,23 @@ def determine_coextensive_clusters(factor_list: list, formula: list) -> list:
         a nested list with one sublist per cluster of coextensive factors, the sublists
         contain all factors that are coextensive with each other
     """
-    list_of_coextensives = [] # this becomes a nested list: every sublist contains factors that are mutually coextensive
-
-    for i in range(len(factor_list)-1):
-        for j in range(i+1,len(factor_list)):
-            co_ext = True
-            for disj in formula:
-                neg_i = "~" + factor_list[i]
-                neg_j = "~" + factor_list[j]
-                if (((factor_list[i] in disj) and not(factor_list[j] in disj)) or \
-                   ((factor_list[j] in disj) and not(factor_list[i] in disj)) or \
-                   ((neg_i in disj) and not(neg_j in disj)) or ((neg_j in disj) and not(neg_i in disj))):
-                    co_ext = False # two factors are not coextensive if one or its negation appears in one disjunct but the other
-                    break          # does not
-
-            if co_ext:
-                if not(list_of_coextensives): # if list of coextensives is still empty
-                    list_of_coextensives.append([]) # append an empty sublist
-                    list_of_coextensives[0].append(factor_list[i])
-                    list_of_coextensives[0].append(factor_list[j])
-                else: # list is non-empty search for a sublist that contains factor_list[i]
-                    new_list = True
-                    for sublist in list_of_coextensives:
-                        if ((factor_list[i] in sublist) or (factor_list[j] in sublist)):
-                            # at least one of both factors is already contained in one sublist of coextensive factors
-                            new_list = False
-                            if not(factor_list[i] in sublist): # and factor_list[i] is not,
-                                sublist.append(factor_list[i]) # then add factor_list[i] to sublist
-                            elif not(factor_list[j] in sublist): # other case factor_list[j] is not contained,
-                                sublist.append(factor_list[j]) # then add it to sublist
-                            break
-                    if new_list: # neither factor is already contained in any sublist
-                        list_of_coextensives.append([]) # create a new sublist
-                        list_of_coextensives[-1].append(factor_list[i]) # append factor_list[i]
-                        list_of_coextensives[-1].append(factor_list[j]) # and factor_list[j]
+    # two factors are not coextensive if one or its negation appears in one disjunct but the other does not,
+    # hence they are coextensive iff they appear in the same disjuncts and their negations appear in the same disjuncts
+    # -> the signature of a factor encodes the disjuncts in which it and its negation appear as two bitmasks,
+    # the clusters are the groups of factors with equal signatures
+    set_formula = [set(disj) for disj in formula]
+    clusters = {} # signature -> list of factors with that signature, in the order of factor_list
+    for fac in factor_list:
+        neg_fac = "~" + fac
+        pos_mask = 0
+        neg_mask = 0
+        for index, disj in enumerate(set_formula):
+            if fac in disj:
+                pos_mask |= 1 << index
+            if neg_fac in disj:
+                neg_mask |= 1 << index
+        clusters.setdefault((pos_mask, neg_mask), []).append(fac)
+
+    # this becomes a nested list: every sublist contains factors that are mutually coextensive
+    list_of_coextensives = [cluster for cluster in clusters.values() if len(cluster) > 1]
     return list_of_coextensives
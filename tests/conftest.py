@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+
+# file: conftest.py
+
+"""pytest configuration: the modules of mlca import each other by their plain module names,
+so their directory is put on the search path
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.joinpath('src').joinpath('mlca')))
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+# file: test_atomic_formulae.py
+
+"""tests of the derivation of atomic solution formulae
+"""
+
+import atomic_formulae as af
+
+
+def test_get_rdnf_single_product():
+    # ~F is essential, the remaining min-term is covered by D*~E or G, every one of them is a solution
+    pi_list = ['~F', 'D*~E', 'G']
+    formula = {'~F*A': True, 'D*~E*G*F': True, 'F*~G*~D': False}
+
+    assert af.get_rdnf(pi_list, formula, ['A', 'D', 'E', 'F', 'G']) == ['~F + D*~E', '~F + G']
+
+
+def test_coextensive_factor_with_suffix_name(tmp_path):
+    # A and BA are coextensive, the formulae of BA end with "A" but must not be rewritten as formulae of A
+    csv_file = tmp_path.joinpath('coextensive.csv')
+    csv_file.write_text("A,BA\n0,0\n1,1\n")
+
+    abort, level_factor_list, equiv_list, order_list = af.read_data_from_csv(str(csv_file))
+
+    assert level_factor_list == [['A', 'BA']]
+    assert equiv_list == [('BA', 'A'), ('A', 'BA')]
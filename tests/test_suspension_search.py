@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+# file: test_suspension_search.py
+
+"""tests of the suspension tree search
+"""
+
+from suspension_search import Node, get_accuracy, get_recall_and_specificity
+
+# truth table of T <-> A*~B + C*~B
+DATA_TABLE = [{'A': a, 'B': b, 'C': c, 'T': (a or c) and not(b)} \
+              for a in (True, False) for b in (True, False) for c in (True, False)]
+
+
+def create_node(value: list, name: str) -> Node:
+    recall, specificity = get_recall_and_specificity(value, DATA_TABLE, 'T')
+    return Node(value, name=name, level=0, accuracy=get_accuracy(value, DATA_TABLE, 'T'), recall=recall, specificity=specificity)
+
+
+def test_extend_disjunct_contained_in_another_disjunct():
+    # the disjunct ~B also occurs inside A*~B, extending it by C must still yield a new formula
+    current_node = create_node([['A', '~B'], ['~B']], 'A*~B + ~B')
+    anc_node = create_node([['C']], 'C')
+
+    children = current_node.create_new_nodes([anc_node], DATA_TABLE, 'T', [current_node, anc_node])
+
+    assert [child.value for child in children] == [[['A', '~B'], ['C', '~B']], [['A', 'C', '~B'], ['~B']]]